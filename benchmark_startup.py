@@ -0,0 +1,54 @@
+"""
+Startup benchmark: cold import time of the orchestrator module and the cost
+of building orchestrators, each import measured in a fresh interpreter.
+
+    python benchmark_startup.py            # 5 cold imports
+    python benchmark_startup.py -n 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import src.orchestrator
+print(time.perf_counter() - started)
+"""
+
+BUILD_SNIPPET = """
+import time
+from src.orchestrator import ContentCreationOrchestrator
+timings = []
+for _ in range(5):
+    started = time.perf_counter()
+    ContentCreationOrchestrator(checkpoint_path=None).workflow
+    timings.append(time.perf_counter() - started)
+print(timings[0], sum(timings[1:]) / len(timings[1:]))
+"""
+
+
+def run_snippet(snippet: str) -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], capture_output=True, text=True, check=True
+    ).stdout
+    return [float(value) for value in output.split()[-2:] if value]
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Measure import and construction time of the orchestrator")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="cold imports to measure")
+    args = parser.parse_args(argv)
+
+    imports = [run_snippet(IMPORT_SNIPPET)[-1] for _ in range(args.runs)]
+    first, later = run_snippet(BUILD_SNIPPET)
+
+    print(f"import src.orchestrator   median {statistics.median(imports) * 1000:7.1f} ms  "
+          f"(min {min(imports) * 1000:.1f}, max {max(imports) * 1000:.1f}, n={args.runs})")
+    print(f"first orchestrator       {first * 1000:7.1f} ms  (imports LangGraph, compiles the graph)")
+    print(f"each later orchestrator  {later * 1000:7.1f} ms  (shares the compiled graph)")
+
+
+if __name__ == "__main__":
+    main()
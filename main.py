@@ -1,4 +1,9 @@
 from src.orchestrator import ContentCreationOrchestrator
+from src.utils.instrumentation import format_timings
+from src.utils.llm_cache import llm_cache_stats
+from src.utils.resilience import resilience_stats
+from src.utils.router import backend_router
+from src.utils.semantic_cache import semantic_cache_stats
 
 # User inputs - GrowthOS AI Visibility Startup
 brand_info = "Centre for Development of Telematics (Working on developing mission critical communication)"
@@ -50,4 +55,21 @@ print(f"  • Brand: {brand_info}")
 print(f"  • Focus: {topic}")
 print(f"  • Research sources: {result['research_sources']}")
 print(f"  • All content optimized for market penetration messaging")
+print("\n⏱️  Timings:")
+print("\n".join(format_timings(result["timings"])))
+cache_stats = llm_cache_stats()
+if cache_stats:
+    print(f"\n💾 LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']:.0%} hit rate)")
+for namespace, stats in semantic_cache_stats().items():
+    print(f"🧭 Semantic {namespace} cache: {stats['hits']} hits, {stats['misses']} misses")
+for backend, stats in backend_router().stats().items():
+    print(f"🔀 {backend}: {stats['routed']} calls routed, mean latency {stats['mean_latency']}s, "
+          f"error rate {stats['error_rate']:.0%}")
+resilience = resilience_stats()
+for backend, breaker in resilience["breakers"].items():
+    print(f"🛡️  {backend} circuit {breaker['state']} (opened {breaker['times_opened']}x), "
+          f"{resilience['fallbacks'].get(backend, 0)} fallback calls")
+for name, count in sorted(resilience["retries"].items()):
+    print(f"🔄 {name}: {count} LLM retries")
 print("="*80)
@@ -1,22 +1,327 @@
-from langchain_ollama import OllamaLLM  
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager, nullcontext
+from src.utils.cache import fast_hash
+from src.utils.context_budget import token_counter
+from src.utils.env import getenv
+from src.utils.instrumentation import track
+from src.utils.rate_limiter import expected_completion_tokens, request_scheduler
+from src.utils.resilience import (
+    CircuitOpenError, aretrying, circuit_breaker, is_backend_failure, record_fallback, retrying
+)
+from src.utils.router import backend_router
+from src.utils.single_flight import single_flight
+from src.utils.streaming import TokenChunk, current_node, emit, streaming_active
 
-load_dotenv()
+LLM_MODELS = {"ollama": "llama3.2", "groq": "llama-3.1-8b-instant"}
 
-def get_llm(temperature=0.5, use_local=True):
+# Shared LLMs. _llm_clients holds one client per (provider, model, options),
+# each with its own keep-alive connection pool; _llm_registry holds copies of
+# them at each requested temperature, which reuse that pool.
+_llm_clients = {}
+_llm_registry = {}
+_registry_lock = threading.Lock()
+
+def get_provider(use_local=True):
+    """
+    Name of the backend get_llm() returns for the given use_local flag
+    """
+    return "ollama" if use_local else "groq"
+
+def http_pool_limits():
+    """
+    Connection pool limits for the shared LLM clients, overridable from the
+    environment (LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE and
+    LLM_POOL_KEEPALIVE_EXPIRY in seconds)
     """
-    Get LLM - local Ollama (free, unlimited) or Groq (rate limited)
+    import httpx
+    return httpx.Limits(
+        max_connections=int(getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60")),
+    )
+
+def _build_llm(provider, options):
     """
-    if use_local:
-        return OllamaLLM(  
-            model="llama3.2",
-            temperature=temperature
+    New LLM client with a pooled, keep-alive HTTP client. Provider packages
+    are imported here, on first use, not at module load.
+    """
+    limits = http_pool_limits()
+    if provider == "ollama":
+        from langchain_ollama import OllamaLLM
+        return OllamaLLM(
+            model=LLM_MODELS[provider],
+            client_kwargs={"limits": limits},
+            **options
         )
     else:
+        import httpx
+        from langchain_groq import ChatGroq
+        from src.utils.http_clients import LoopLocalAsyncClient
         return ChatGroq(
-            temperature=temperature,
-            model_name="llama-3.1-8b-instant",
-            groq_api_key=os.getenv("GROQ_API_KEY")
+            model_name=LLM_MODELS[provider],
+            groq_api_key=getenv("GROQ_API_KEY"),
+            # Retries and backoff are handled around the call (src.utils.resilience)
+            max_retries=0,
+            http_client=httpx.Client(limits=limits),
+            # One pool per event loop: connections can't outlive their loop
+            http_async_client=LoopLocalAsyncClient(limits=limits),
+            **options
         )
+
+def get_llm(temperature=0.5, use_local=True, cache=True, **options):
+    """
+    Get LLM - local Ollama (free, unlimited) or Groq (rate limited).
+    LLMs are shared: every call with the same provider, model, temperature
+    and options returns the same thread-safe instance, and all temperatures
+    of a provider/model/options share one HTTP connection pool. Extra
+    keyword options (e.g. max_tokens) go to the LLM class and must be hashable.
+
+    Responses are served from the persistent LLM response cache (see
+    src.utils.llm_cache) unless `cache` is False.
+    """
+    provider = get_provider(use_local)
+    client_key = (provider, LLM_MODELS[provider], tuple(sorted(options.items())))
+    key = client_key + (temperature, bool(cache))
+    with _registry_lock:
+        if key not in _llm_registry:
+            if client_key not in _llm_clients:
+                _llm_clients[client_key] = _build_llm(provider, options)
+            _llm_registry[key] = _llm_clients[client_key].model_copy(update={
+                "temperature": temperature,
+                "cache": _response_cache(provider, temperature) if cache else False,
+            })
+        return _llm_registry[key]
+
+def _response_cache(provider, temperature):
+    from src.utils.llm_cache import llm_response_cache
+    response_cache = llm_response_cache()
+    # None leaves LangChain's own global cache setting in charge
+    return response_cache.for_llm(LLM_MODELS[provider], temperature) if response_cache else None
+
+
+class BaseAgent:
+    """
+    Shared plumbing for agents built around a `prompt | llm | parser` chain.
+    Subclasses set self.chain (and self.provider) in __init__ and call
+    _invoke / _ainvoke instead of touching the chain directly, so every LLM
+    call is timed under timings["llm"][<agent class>].
+
+    Agents that set `stream_key` stream their output while a caller is
+    consuming the orchestrator's event stream, emitting a TokenChunk per
+    piece; the returned text is the same as with invoke.
+
+    Each call goes to the backend the shared router expects to finish it
+    soonest, among self.provider (the home backend) and the `backends` the
+    agent allows; see src.utils.router. On the chosen backend, calls to
+    rate-limited models (Groq) first wait for room in the model's
+    requests/tokens-per-minute budget (see src.utils.rate_limiter), then
+    hold a slot of `limiter` (set by the orchestrator).
+
+    Transient failures are retried with jittered exponential backoff, and
+    each backend has a circuit breaker: while it is open the router skips
+    that backend, and if every allowed backend is open the call falls back
+    to any other (Groq <-> Ollama); see src.utils.resilience.
+
+    Identical calls already in flight (same agent, temperature and prompt)
+    are coalesced into one; see src.utils.single_flight.
+
+    LLM responses are cached (see get_llm). An agent opts out by setting
+    `cache_responses = False`, or at runtime by listing its class name in
+    LLM_CACHE_SKIP_AGENTS (comma-separated).
+    """
+
+    stream_key = None
+    cache_responses = True
+    backends = ()
+    limiter = None
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @property
+    def caches_responses(self) -> bool:
+        skipped = {name.strip() for name in getenv("LLM_CACHE_SKIP_AGENTS", "").split(",")}
+        return self.cache_responses and self.name not in skipped
+
+    @property
+    def allowed_backends(self) -> tuple:
+        """Backends this agent may run on, home backend first"""
+        return (self.provider,) + tuple(b for b in self.backends if b != self.provider)
+
+    def _invoke(self, inputs: dict, chain=None) -> str:
+        """Run the agent's chain (or `chain`, a variant of it) synchronously"""
+        chain = chain or self.chain
+        key = self._flight_key(chain, inputs)
+        if key is None:
+            return self._invoke_with_retries(chain, inputs)
+        return single_flight("llm").do(key, lambda: self._invoke_with_retries(chain, inputs))
+
+    async def _ainvoke(self, inputs: dict, chain=None) -> str:
+        """Run the agent's chain (or `chain`, a variant of it) on the event loop"""
+        chain = chain or self.chain
+        key = self._flight_key(chain, inputs)
+        if key is None:
+            return await self._ainvoke_with_retries(chain, inputs)
+        return await single_flight("llm").ado(key, lambda: self._ainvoke_with_retries(chain, inputs))
+
+    def _flight_key(self, chain, inputs: dict):
+        """
+        Key under which identical concurrent calls (same agent class,
+        temperature and rendered prompt, e.g. from parallel campaigns for
+        one brief) share a single LLM call. None for streamed calls, whose
+        chunks belong to one caller's event stream.
+        """
+        if self.stream_key and streaming_active():
+            return None
+        return fast_hash(self.name, repr(chain.middle[0].temperature), chain.first.invoke(inputs).to_string())
+
+    def _invoke_with_retries(self, chain, inputs: dict) -> str:
+        for attempt in retrying(self.name):
+            with attempt:
+                return self._call(chain, inputs, self._route(chain, inputs))
+
+    async def _ainvoke_with_retries(self, chain, inputs: dict) -> str:
+        async for attempt in aretrying(self.name):
+            with attempt:
+                return await self._acall(chain, inputs, self._route(chain, inputs))
+
+    def _call(self, chain, inputs: dict, backend: str) -> str:
+        """One attempt on `backend`"""
+        chain = self._chain_on(chain, backend)
+        router = backend_router()
+        with self._breaker_guard(backend), self._scheduled(chain, inputs, backend, asynchronous=False):
+            with router.pending(backend), self._slot(backend):
+                with track("llm", self.name), router.observe(backend):
+                    if self.stream_key and streaming_active():
+                        return "".join(self._emit_chunk(chunk) for chunk in chain.stream(inputs))
+                    return chain.invoke(inputs)
+
+    async def _acall(self, chain, inputs: dict, backend: str) -> str:
+        """Async counterpart of _call()"""
+        chain = self._chain_on(chain, backend)
+        router = backend_router()
+        with self._breaker_guard(backend):
+            async with self._scheduled(chain, inputs, backend, asynchronous=True):
+                with router.pending(backend):
+                    async with self._aslot(backend):
+                        with track("llm", self.name), router.observe(backend):
+                            if self.stream_key and streaming_active():
+                                return "".join([self._emit_chunk(chunk) async for chunk in chain.astream(inputs)])
+                            return await chain.ainvoke(inputs)
+
+    @staticmethod
+    @contextmanager
+    def _breaker_guard(backend: str):
+        """
+        Report the outcome of the enclosed call to `backend`'s circuit
+        breaker. Errors that aren't the backend's fault (bad requests,
+        parse errors) count as neither failure nor success.
+        """
+        breaker = circuit_breaker(backend)
+        try:
+            yield
+        except Exception as error:
+            if is_backend_failure(error):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            # Cancelled, not failed: don't count it, but free a half-open trial
+            breaker.release()
+            raise
+        breaker.record_success()
+
+    def _route(self, chain, inputs: dict) -> str:
+        """
+        Backend for the next attempt: the router's pick among the allowed
+        backends whose breakers are closed, or, while they are all open, any
+        other backend that is still up
+        """
+        allowed = [backend for backend in self.allowed_backends if circuit_breaker(backend).available()]
+        if not allowed:
+            allowed = [
+                backend for backend in LLM_MODELS
+                if backend not in self.allowed_backends and circuit_breaker(backend).available()
+            ]
+            if not allowed:
+                raise CircuitOpenError(f"{self.name}: circuit open for {', '.join(self.allowed_backends)}")
+            print(f"⚠️  {self.name}: {', '.join(self.allowed_backends)} unavailable, falling back to {allowed[0]}")
+            record_fallback(allowed[0])
+            allowed = allowed[:1]
+
+        # A backend that already has the response answers at once, without
+        # spending any rate budget
+        cached = [backend for backend in allowed if self._cached(self._chain_on(chain, backend), inputs)]
+        if cached:
+            allowed = cached[:1]
+
+        if len(allowed) == 1:
+            backend = backend_router().choose(allowed)
+        else:
+            scheduler = request_scheduler()
+            tokens = self._call_tokens(chain, inputs)
+            # A call moved off its home backend is also charged for the share
+            # of the other backend's rate budget it takes from that backend's
+            # own callers (e.g. QualityAgent, which only runs on Groq)
+            backend = backend_router().choose(allowed, waits={
+                backend: scheduler.wait(LLM_MODELS[backend], tokens)
+                + (scheduler.share_seconds(LLM_MODELS[backend], tokens) if backend != allowed[0] else 0.0)
+                for backend in allowed
+            })
+        if not circuit_breaker(backend).allow():
+            # Another call took the half-open trial first
+            raise CircuitOpenError(f"{self.name}: circuit open for {backend}")
+        return backend
+
+    def _chain_on(self, chain, backend: str):
+        """`chain` with its LLM swapped for the shared one on `backend` at the same temperature"""
+        if backend == self.provider:
+            return chain
+        variants = self.__dict__.setdefault("_backend_chains", {})
+        key = (id(chain), backend)
+        if key not in variants:
+            llm = get_llm(
+                temperature=chain.middle[0].temperature,
+                use_local=backend == "ollama",
+                cache=self.caches_responses
+            )
+            # Keep the original alive so its id can't be reused
+            variants[key] = (chain, chain.first | llm | chain.last)
+        return variants[key][1]
+
+    def _slot(self, backend: str):
+        return self.limiter.slot(backend) if self.limiter is not None else nullcontext()
+
+    def _aslot(self, backend: str):
+        return self.limiter.aslot(backend) if self.limiter is not None else nullcontext()
+
+    def _scheduled(self, chain, inputs: dict, backend: str, asynchronous: bool):
+        """
+        Rate-limit slot for this call on the backend's model, sized by the
+        rendered prompt plus the expected completion. Calls the response
+        cache will answer don't reach the model and book nothing.
+        """
+        model = LLM_MODELS[backend]
+        scheduler = request_scheduler()
+        if not scheduler.is_limited(model) or self._cached(chain, inputs):
+            return nullcontext()
+        tokens = self._call_tokens(chain, inputs)
+        return scheduler.aslot(model, tokens) if asynchronous else scheduler.slot(model, tokens)
+
+    def _cached(self, chain, inputs: dict) -> bool:
+        """Whether the response cache holds `chain`'s answer (streamed calls always reach the model)"""
+        if self.stream_key and streaming_active():
+            return False
+        from src.utils.llm_cache import has_cached_response
+        return has_cached_response(chain.middle[0], chain.first.invoke(inputs))
+
+    @staticmethod
+    def _call_tokens(chain, inputs: dict) -> int:
+        """Rate-limit tokens of a call: the rendered prompt plus the expected completion"""
+        return token_counter.count(chain.first.invoke(inputs).to_string()) + expected_completion_tokens()
+
+    def _emit_chunk(self, chunk: str) -> str:
+        emit(TokenChunk(platform=self.stream_key, node=current_node(), text=chunk))
+        return chunk
@@ -1,18 +1,109 @@
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from src.agents.base_agent import get_llm  # Add this
-import os
-from dotenv import load_dotenv
+from src.agents.base_agent import BaseAgent, get_llm, get_provider
+from src.utils.context_budget import fit_to_budget
+from typing import Optional
 
-load_dotenv()
 
-class EnhancedTwitterAgent:
+class PlatformAgent(BaseAgent):
+    """
+    Common generate/agenerate for the research-driven platform agents.
+    Subclasses build self.chain and set `platform` and `progress_message`.
+
+    The research report and strategy are fitted to per-agent token budgets
+    before they go into the prompt, keeping the platform's own sections,
+    hooks, statistics and CTAs first.
+    """
+
+    platform = ""
+    progress_message = ""
+    # Drafts can come from either backend when the home one is backed up
+    backends = ("groq", "ollama")
+    context_budgets = {"research_report": 1000, "strategy": 1200}
+    context_priorities = ("hook", "statistic", "call-to-action", "call to action", "cta", "keyword", "hashtag")
+
+    @property
+    def stream_key(self) -> str:
+        return self.platform.lower()
+
+    def _inputs(self, research_report: str, strategy: str, brand_info: str,
+                topic: str, brand_tone: str, feedback: str) -> dict:
+        priorities = (self.platform.lower(),) + self.context_priorities
+        return {
+            "research_report": fit_to_budget(research_report, self.context_budgets["research_report"], priorities),
+            "strategy": fit_to_budget(strategy, self.context_budgets["strategy"], priorities),
+            "brand_info": brand_info,
+            "topic": topic,
+            "brand_tone": brand_tone,
+            "feedback": feedback
+        }
+
+    def _chain_for(self, temperature: Optional[float]):
+        """
+        The agent's chain, or one whose LLM samples at `temperature`. Variant
+        LLMs come from the shared registry, so they reuse the same connections.
+        """
+        if temperature is None or temperature == self.llm.temperature:
+            return self.chain
+        variants = self.__dict__.setdefault("_variant_chains", {})
+        if temperature not in variants:
+            llm = get_llm(temperature=temperature, use_local=self.provider == "ollama", cache=self.caches_responses)
+            variants[temperature] = self.prompt | llm | StrOutputParser()
+        return variants[temperature]
+
+    def generate(self, research_report: str, strategy: str, brand_info: str,
+                 topic: str, brand_tone: str, feedback: str = "",
+                 temperature: Optional[float] = None) -> dict:
+        try:
+            print(f"\n{self.progress_message}")
+            content = self._invoke(self._inputs(
+                research_report, strategy, brand_info, topic, brand_tone, feedback
+            ), chain=self._chain_for(temperature))
+
+            return {
+                "success": True,
+                "platform": self.platform,
+                "content": content
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def agenerate(self, research_report: str, strategy: str, brand_info: str,
+                        topic: str, brand_tone: str, feedback: str = "",
+                        temperature: Optional[float] = None) -> dict:
+        """Async counterpart of generate()"""
+        try:
+            print(f"\n{self.progress_message}")
+            content = await self._ainvoke(self._inputs(
+                research_report, strategy, brand_info, topic, brand_tone, feedback
+            ), chain=self._chain_for(temperature))
+
+            return {
+                "success": True,
+                "platform": self.platform,
+                "content": content
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+
+class EnhancedTwitterAgent(PlatformAgent):
     """
     Research-driven Twitter thread generator
     """
     
+    platform = "Twitter"
+    progress_message = "🐦 Generating Twitter thread..."
+    
     def __init__(self):
-        self.llm = get_llm(temperature=0.7, use_local=False)
+        self.llm = get_llm(temperature=0.7, use_local=False, cache=self.caches_responses)
+        self.provider = get_provider(use_local=False)
         
         self.prompt = PromptTemplate(
             input_variables=["research_report", "strategy", "brand_info", "topic", "brand_tone", "feedback"],
@@ -51,39 +142,19 @@ class EnhancedTwitterAgent:
         )
         
         self.chain = self.prompt | self.llm | StrOutputParser()
-    
-    def generate(self, research_report: str, strategy: str, brand_info: str, 
-                 topic: str, brand_tone: str, feedback: str) -> dict:
-        try:
-            print("\n🐦 Generating Twitter thread...")
-            thread = self.chain.invoke({
-                "research_report": research_report,
-                "strategy": strategy,
-                "brand_info": brand_info,
-                "topic": topic,
-                "brand_tone": brand_tone,
-                "feedback": feedback
-            })
-            
-            return {
-                "success": True,
-                "platform": "Twitter",
-                "content": thread
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
 
 
-class EnhancedLinkedInAgent:
+class EnhancedLinkedInAgent(PlatformAgent):
     """
     Research-driven LinkedIn post generator
     """
     
+    platform = "LinkedIn"
+    progress_message = "💼 Generating LinkedIn post..."
+    
     def __init__(self):
-        self.llm = get_llm(temperature=0.7, use_local=True)
+        self.llm = get_llm(temperature=0.7, use_local=True, cache=self.caches_responses)
+        self.provider = get_provider(use_local=True)
         
         self.prompt = PromptTemplate(
             input_variables=["research_report", "strategy", "brand_info", "topic", "brand_tone", "feedback"],
@@ -122,39 +193,20 @@ class EnhancedLinkedInAgent:
         )
         
         self.chain = self.prompt | self.llm | StrOutputParser()
-    
-    def generate(self, research_report: str, strategy: str, brand_info: str,
-                 topic: str, brand_tone: str, feedback: str) -> dict:
-        try:
-            print("\n💼 Generating LinkedIn post...")
-            post = self.chain.invoke({
-                "research_report": research_report,
-                "strategy": strategy,
-                "brand_info": brand_info,
-                "topic": topic,
-                "brand_tone": brand_tone,
-                "feedback": feedback
-            })
-            
-            return {
-                "success": True,
-                "platform": "LinkedIn",
-                "content": post
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
 
 
-class EnhancedInstagramAgent:
+class EnhancedInstagramAgent(PlatformAgent):
     """
     Research-driven Instagram caption generator
     """
     
+    platform = "Instagram"
+    progress_message = "📸 Generating Instagram caption..."
+    context_budgets = {"research_report": 800, "strategy": 1000}
+    
     def __init__(self):
-        self.llm = get_llm(temperature=0.7, use_local=False)
+        self.llm = get_llm(temperature=0.7, use_local=False, cache=self.caches_responses)
+        self.provider = get_provider(use_local=False)
         
         self.prompt = PromptTemplate(
             input_variables=["research_report", "strategy", "brand_info", "topic", "brand_tone", "feedback"],
@@ -193,39 +245,20 @@ class EnhancedInstagramAgent:
         )
         
         self.chain = self.prompt | self.llm | StrOutputParser()
-    
-    def generate(self, research_report: str, strategy: str, brand_info: str,
-                 topic: str, brand_tone: str, feedback: str) -> dict:
-        try:
-            print("\n📸 Generating Instagram caption...")
-            caption = self.chain.invoke({
-                "research_report": research_report,
-                "strategy": strategy,
-                "brand_info": brand_info,
-                "topic": topic,
-                "brand_tone": brand_tone,
-                "feedback": feedback
-            })
-            
-            return {
-                "success": True,
-                "platform": "Instagram",
-                "content": caption
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
 
 
-class NewsletterAgent:
+class NewsletterAgent(PlatformAgent):
     """
     Research-driven email newsletter generator
     """
     
+    platform = "Newsletter"
+    progress_message = "📧 Generating email newsletter..."
+    context_budgets = {"research_report": 1500, "strategy": 1200}
+    
     def __init__(self):
-        self.llm = get_llm(temperature=0.5, use_local=False)
+        self.llm = get_llm(temperature=0.5, use_local=False, cache=self.caches_responses)
+        self.provider = get_provider(use_local=False)
         
         self.prompt = PromptTemplate(
             input_variables=["research_report", "strategy", "brand_info", "topic", "brand_tone", "feedback"],
@@ -271,27 +304,3 @@ class NewsletterAgent:
         )
         
         self.chain = self.prompt | self.llm | StrOutputParser()
-    
-    def generate(self, research_report: str, strategy: str, brand_info: str,
-                 topic: str, brand_tone: str, feedback: str = "") -> dict:
-        try:
-            print("\n📧 Generating email newsletter...")
-            newsletter = self.chain.invoke({
-                "research_report": research_report,
-                "strategy": strategy,
-                "brand_info": brand_info,
-                "topic": topic,
-                "brand_tone": brand_tone,
-                "feedback": feedback
-            })
-            
-            return {
-                "success": True,
-                "platform": "Newsletter",
-                "content": newsletter
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
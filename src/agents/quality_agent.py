@@ -1,19 +1,48 @@
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from src.agents.base_agent import get_llm  # Add this
-import os
-from dotenv import load_dotenv
-from typing import Dict
+from src.agents.base_agent import LLM_MODELS, BaseAgent, get_llm, get_provider
+from src.utils.cache import PersistentCache, content_hash
+from src.utils.concurrency import map_concurrently
+from src.utils.context_budget import fit_to_budget
+from src.utils.env import getenv
+from src.utils.prescreen import prescreen, prescreen_enabled
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import re
 
-load_dotenv()
+# Section header the batch evaluator writes before each draft's evaluation
+_DRAFT_HEADER = re.compile(r"^\W*DRAFT\s+(\d+)\b.*$", re.IGNORECASE | re.MULTILINE)
 
-class QualityAgent:
+
+class QualityAgent(BaseAgent):
     """
     Reviews generated content for quality, consistency, and effectiveness
     """
     
-    def __init__(self):
-        self.llm = get_llm(temperature=0.2, use_local=False)
+    # Scores from different models aren't comparable, so evaluation stays on Groq
+    backends = ()
+    
+    # Token budget for the strategy guidelines and what to keep first when trimming
+    strategy_budget = 1000
+    # Most drafts scored by one evaluate_batch() call
+    batch_size = 4
+    strategy_priorities = ("hook", "call-to-action", "call to action", "cta", "core message", "keyword", "hashtag")
+    
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Evaluations are memoised by (platform, content, strategy, brand_tone)
+        plus the model, temperature and prompts that produced them, so
+        unchanged drafts are never scored twice. cache_path (or the
+        QUALITY_CACHE_PATH env var) persists the memo to SQLite across runs;
+        QUALITY_CACHE_TTL (seconds, default a week) and
+        QUALITY_CACHE_MAX_ENTRIES (default 10000) bound it.
+        """
+        ttl = float(getenv("QUALITY_CACHE_TTL", str(7 * 24 * 3600)))
+        max_entries = int(getenv("QUALITY_CACHE_MAX_ENTRIES", "10000"))
+        self.cache = PersistentCache(cache_path or getenv("QUALITY_CACHE_PATH") or None, namespace="quality",
+                                     ttl=ttl or None, max_entries=max_entries or None)
+        self.llm = get_llm(temperature=0.2, use_local=False, cache=self.caches_responses)
+        self.provider = get_provider(use_local=False)
         
         self.evaluation_prompt = PromptTemplate(
             input_variables=["platform", "content", "strategy", "brand_tone"],
@@ -58,43 +87,275 @@ class QualityAgent:
         )
         
         self.chain = self.evaluation_prompt | self.llm | StrOutputParser()
+        
+        # Scores several drafts against one copy of the strategy
+        self.batch_prompt = PromptTemplate(
+            input_variables=["drafts", "strategy", "brand_tone", "count"],
+            template="""
+            You are a content quality evaluator. Review each of the {count} generated drafts below and provide scores.
+            
+            BRAND TONE: {brand_tone}
+            
+            STRATEGY GUIDELINES:
+            {strategy}
+            
+            {drafts}
+            
+            Evaluate each draft on these criteria (score each 1-10):
+            
+            1. **Brand Alignment**: Does it match the brand tone and voice?
+            2. **Strategy Adherence**: Does it follow the content strategy?
+            3. **Engagement Potential**: Will it capture attention and drive engagement?
+            4. **Clarity**: Is the message clear and easy to understand?
+            5. **Call-to-Action**: Is the CTA clear and compelling?
+            6. **Platform Optimization**: Is it optimized for its platform?
+            
+            For EVERY draft, in order, provide your evaluation in this EXACT format:
+            
+            DRAFT [number]: [platform]
+            SCORES:
+            Brand Alignment: [score]/10
+            Strategy Adherence: [score]/10
+            Engagement Potential: [score]/10
+            Clarity: [score]/10
+            Call-to-Action: [score]/10
+            Platform Optimization: [score]/10
+            
+            OVERALL SCORE: [average]/10
+            
+            FEEDBACK:
+            [Brief constructive feedback - what's good and what could be improved]
+            
+            RECOMMENDATION: [APPROVE or REVISE]
+            """
+        )
+        
+        self.batch_chain = self.batch_prompt | self.llm | StrOutputParser()
+        # A different model, temperature or rubric scores differently, so
+        # they're part of every cache key
+        self._cache_scope = content_hash(
+            LLM_MODELS[self.provider], self.llm.temperature,
+            self.evaluation_prompt.template, self.batch_prompt.template,
+        )
     
     def evaluate(self, platform: str, content: str, strategy: str, brand_tone: str) -> Dict:
         """
-        Evaluate content quality and return scores
+        Evaluate content quality and return scores. Drafts that break the
+        platform's mechanical rules (length, hashtags, subject line) are
+        rejected locally with the violations as feedback, without an LLM call.
+        """
+        rejected = self._prescreened(platform, content)
+        if rejected:
+            return rejected
+        key = self._cache_key(platform, content, strategy, brand_tone)
+        cached = self._cached_result(key)
+        if cached:
+            return cached
+        try:
+            evaluation = self._invoke(self._inputs(platform, content, strategy, brand_tone))
+            return self._store_result(key, self._build_result(platform, evaluation))
+        except Exception as e:
+            return self._error_result(platform, e)
+
+    async def aevaluate(self, platform: str, content: str, strategy: str, brand_tone: str) -> Dict:
+        """
+        Async counterpart of evaluate()
+        """
+        rejected = self._prescreened(platform, content)
+        if rejected:
+            return rejected
+        key = self._cache_key(platform, content, strategy, brand_tone)
+        cached = self._cached_result(key)
+        if cached:
+            return cached
+        try:
+            evaluation = await self._ainvoke(self._inputs(platform, content, strategy, brand_tone))
+            return self._store_result(key, self._build_result(platform, evaluation))
+        except Exception as e:
+            return self._error_result(platform, e)
+
+    def evaluate_batch(self, drafts: List[Tuple[str, str]], strategy: str, brand_tone: str) -> List[Dict]:
+        """
+        Evaluate (platform, content) drafts, returning results in draft order.
+        Drafts not already cached are scored up to `batch_size` per LLM call,
+        sharing one copy of the strategy; any draft whose section of the
+        reply can't be parsed is evaluated on its own instead.
+        """
+        results, pending = self._batch_start(drafts, strategy, brand_tone)
+        chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        for chunk, evaluations in zip(chunks, map_concurrently(
+            lambda chunk: self._evaluate_chunk(chunk, strategy, brand_tone), chunks
+        )):
+            for (index, platform, content), result in zip(chunk, evaluations):
+                results[index] = result
+        return results
+
+    async def aevaluate_batch(self, drafts: List[Tuple[str, str]], strategy: str, brand_tone: str) -> List[Dict]:
+        """
+        Async counterpart of evaluate_batch()
+        """
+        results, pending = self._batch_start(drafts, strategy, brand_tone)
+        chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        for chunk, evaluations in zip(chunks, await asyncio.gather(
+            *(self._aevaluate_chunk(chunk, strategy, brand_tone) for chunk in chunks)
+        )):
+            for (index, platform, content), result in zip(chunk, evaluations):
+                results[index] = result
+        return results
+
+    def _batch_start(self, drafts: List[Tuple[str, str]], strategy: str, brand_tone: str):
+        """
+        Pre-screen rejections and cached results by position, and the
+        (index, platform, content) drafts still to score
         """
+        results: List[Optional[Dict]] = []
+        pending = []
+        for index, (platform, content) in enumerate(drafts):
+            results.append(
+                self._prescreened(platform, content)
+                or self._cached_result(self._cache_key(platform, content, strategy, brand_tone))
+            )
+            if results[-1] is None:
+                pending.append((index, platform, content))
+        return results, pending
+
+    def _evaluate_chunk(self, chunk: list, strategy: str, brand_tone: str) -> List[Dict]:
+        if len(chunk) == 1:
+            return [self.evaluate(chunk[0][1], chunk[0][2], strategy, brand_tone)]
+        try:
+            reply = self._invoke(self._batch_inputs(chunk, strategy, brand_tone), chain=self.batch_chain)
+        except Exception as e:
+            print(f"⚠️  Batch evaluation failed ({e}), evaluating drafts one by one")
+            reply = ""
+        sections = self._batch_sections(reply, len(chunk))
+        return [
+            self._store_result(self._cache_key(platform, content, strategy, brand_tone),
+                               self._build_result(platform, section))
+            if section is not None else self.evaluate(platform, content, strategy, brand_tone)
+            for (index, platform, content), section in zip(chunk, sections)
+        ]
+
+    async def _aevaluate_chunk(self, chunk: list, strategy: str, brand_tone: str) -> List[Dict]:
+        if len(chunk) == 1:
+            return [await self.aevaluate(chunk[0][1], chunk[0][2], strategy, brand_tone)]
         try:
-            evaluation = self.chain.invoke({
-                "platform": platform,
-                "content": content,
-                "strategy": strategy,
-                "brand_tone": brand_tone
-            })
-            
-            # Parse overall score
-            overall_score = self._extract_overall_score(evaluation)
-            recommendation = self._extract_recommendation(evaluation)
-            
-            return {
-                "success": True,
-                "platform": platform,
-                "evaluation": evaluation,
-                "overall_score": overall_score if overall_score > 0 else 8.0,  # Default to 8.0 if parsing fails
-                "recommendation": recommendation if recommendation else "APPROVE",
-                "feedback": self._extract_feedback(evaluation), 
-                "approved": recommendation == "APPROVE" and overall_score >= 7.5  # Approve if score >= 7.5
-            }
+            reply = await self._ainvoke(self._batch_inputs(chunk, strategy, brand_tone), chain=self.batch_chain)
         except Exception as e:
-            # Return safe default on error
-            return {
-                "success": True,
-                "platform": platform,
-                "evaluation": f"Evaluation error: {str(e)}",
-                "overall_score": 8.0,
-                "recommendation": "APPROVE",
-                "feedback": "Evaluation could not be completed due to an error.", 
-                "approved": True
-            }
+            print(f"⚠️  Batch evaluation failed ({e}), evaluating drafts one by one")
+            reply = ""
+        sections = self._batch_sections(reply, len(chunk))
+        fallbacks = await asyncio.gather(*(
+            self.aevaluate(platform, content, strategy, brand_tone)
+            for (index, platform, content), section in zip(chunk, sections) if section is None
+        ))
+        fallbacks = iter(fallbacks)
+        return [
+            self._store_result(self._cache_key(platform, content, strategy, brand_tone),
+                               self._build_result(platform, section))
+            if section is not None else next(fallbacks)
+            for (index, platform, content), section in zip(chunk, sections)
+        ]
+
+    def _batch_inputs(self, chunk: list, strategy: str, brand_tone: str) -> Dict:
+        platforms = tuple(dict.fromkeys(platform.lower() for _, platform, _ in chunk))
+        drafts = "\n\n".join(
+            f"DRAFT {number}: {platform}\nGENERATED CONTENT:\n{content}"
+            for number, (_, platform, content) in enumerate(chunk, 1)
+        )
+        return {
+            "drafts": drafts,
+            "strategy": fit_to_budget(strategy, self.strategy_budget, platforms + self.strategy_priorities),
+            "brand_tone": brand_tone,
+            "count": len(chunk)
+        }
+
+    def _batch_sections(self, reply: str, count: int) -> List[Optional[str]]:
+        """
+        The evaluation text for each of `count` drafts, split on the
+        "DRAFT n:" headers. A section is None if it is missing or lacks a
+        parsable overall score or recommendation.
+        """
+        sections: List[Optional[str]] = [None] * count
+        headers = list(_DRAFT_HEADER.finditer(reply))
+        for header, following in zip(headers, headers[1:] + [None]):
+            number = int(header.group(1))
+            if not 1 <= number <= count or sections[number - 1] is not None:
+                continue
+            section = reply[header.end():following.start() if following else len(reply)].strip()
+            if self._extract_overall_score(section) > 0 and "RECOMMENDATION:" in section:
+                sections[number - 1] = section
+        return sections
+
+    def _prescreened(self, platform: str, content: str) -> Optional[Dict]:
+        """Rejection for a draft that fails the local pre-screen, else None"""
+        if not prescreen_enabled():
+            return None
+        violations = prescreen(platform, content)
+        if not violations:
+            return None
+        listed = "\n".join(f"- {violation}" for violation in violations)
+        return {
+            "success": True,
+            "platform": platform,
+            "evaluation": f"Pre-screen failed:\n{listed}",
+            # Below any approvable score; fewer violations rank higher among rejects
+            "overall_score": max(1.0, 5.0 - len(violations)),
+            "recommendation": "REVISE",
+            "feedback": f"Fix these platform requirements:\n{listed}",
+            "approved": False,
+            "violations": violations,
+            "prescreened": True
+        }
+
+    def _cache_key(self, platform: str, content: str, strategy: str, brand_tone: str) -> str:
+        return content_hash(self._cache_scope, platform, content, strategy, brand_tone)
+
+    def _cached_result(self, key: str) -> Optional[Dict]:
+        result = self.cache.get(key)
+        return {**result, "cached": True} if result else None
+
+    def _store_result(self, key: str, result: Dict) -> Dict:
+        # Only real evaluations are stored; error defaults are never cached
+        self.cache.set(key, result)
+        return result
+
+    def _inputs(self, platform: str, content: str, strategy: str, brand_tone: str) -> Dict:
+        return {
+            "platform": platform,
+            "content": content,
+            "strategy": fit_to_budget(
+                strategy, self.strategy_budget, (platform.lower(),) + self.strategy_priorities
+            ),
+            "brand_tone": brand_tone
+        }
+
+    def _build_result(self, platform: str, evaluation: str) -> Dict:
+        """Parse the evaluator's reply into the quality dict used by the orchestrator"""
+        # Parse overall score
+        overall_score = self._extract_overall_score(evaluation)
+        recommendation = self._extract_recommendation(evaluation)
+        
+        return {
+            "success": True,
+            "platform": platform,
+            "evaluation": evaluation,
+            "overall_score": overall_score if overall_score > 0 else 8.0,  # Default to 8.0 if parsing fails
+            "recommendation": recommendation if recommendation else "APPROVE",
+            "feedback": self._extract_feedback(evaluation), 
+            "approved": recommendation == "APPROVE" and overall_score >= 7.5  # Approve if score >= 7.5
+        }
+
+    def _error_result(self, platform: str, error: Exception) -> Dict:
+        """Return safe default on error"""
+        return {
+            "success": True,
+            "platform": platform,
+            "evaluation": f"Evaluation error: {str(error)}",
+            "overall_score": 8.0,
+            "recommendation": "APPROVE",
+            "feedback": "Evaluation could not be completed due to an error.", 
+            "approved": True
+        }
 
     def _extract_overall_score(self, evaluation: str) -> float:
         """Extract overall score from evaluation text"""
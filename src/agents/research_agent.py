@@ -1,26 +1,36 @@
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.utils.dedup import dedupe_results
+from src.utils.passages import pack_passages
+from src.utils.search_cache import counting_search_cache
 from src.utils.search_tools import SearchTools
-from src.agents.base_agent import get_llm  # Add this
-from typing import List, Dict
-import os
-from dotenv import load_dotenv
+from src.agents.base_agent import BaseAgent, get_llm, get_provider
+from src.utils.semantic_cache import request_scope, semantic_cache
+from typing import List, Dict, Optional
+import asyncio
 import json
 
-load_dotenv()
 
-
-class ResearchAgent:
+class ResearchAgent(BaseAgent):
     """
     Comprehensive research agent that gathers information from multiple sources
     """
     
+    backends = ("ollama", "groq")
+    
+    # Tokens of search content packed into the synthesis prompt
+    search_results_budget = 2500
+    
     def __init__(self):
         # Use local Ollama - no rate limits!
-        self.llm = get_llm(temperature=0.2, use_local=True)
+        self.llm = get_llm(temperature=0.2, use_local=True, cache=self.caches_responses)
+        self.provider = get_provider(use_local=True)
         
         self.search_tools = SearchTools()
         
+        # Reuses research done for near-identical briefs (None when disabled)
+        self.semantic_cache = semantic_cache("research")
+        
         # Prompt for synthesizing research
         self.synthesis_prompt = PromptTemplate(
             input_variables=["topic", "brand_info", "target_audience", "search_results"],
@@ -72,35 +82,136 @@ class ResearchAgent:
         """
         Main research method - orchestrates the entire research process
         """
+        search_queries = self._start_research(topic, brand_info, target_audience)
+        cached = self._cached_research(topic, brand_info, target_audience)
+        if cached is not None:
+            return cached
+        
+        # Conduct searches, all at once
+        with counting_search_cache() as cache_usage:
+            all_results = self._gather_results(
+                search_queries, self.search_tools.search_many(search_queries, max_results=3)
+            )
+        
+        print(f"\n✅ Distinct results gathered: {len(all_results)}")
+        
+        # Synthesize research
+        print("\n🧠 Synthesizing research insights...")
+        research_report = self._invoke(
+            self._synthesis_inputs(topic, brand_info, target_audience, all_results)
+        )
+        
+        self._store_research(topic, brand_info, target_audience, research_report, all_results)
+        result = self._research_result(topic, brand_info, target_audience, research_report, all_results)
+        result["search_cache"] = self._report_cache_usage(cache_usage)
+        return result
+
+    async def aconduct_research(self,
+                                topic: str,
+                                brand_info: str,
+                                target_audience: str,
+                                industry: str = "") -> dict:
+        """
+        Async counterpart of conduct_research(). The search clients are
+        blocking, so the searches run on the shared search thread pool.
+        """
+        search_queries = self._start_research(topic, brand_info, target_audience)
+        cached = await asyncio.to_thread(self._cached_research, topic, brand_info, target_audience)
+        if cached is not None:
+            return cached
+        
+        # Conduct searches, all at once
+        with counting_search_cache() as cache_usage:
+            all_results = self._gather_results(
+                search_queries, await self.search_tools.asearch_many(search_queries, max_results=3)
+            )
+        
+        print(f"\n✅ Distinct results gathered: {len(all_results)}")
+        
+        # Synthesize research
+        print("\n🧠 Synthesizing research insights...")
+        research_report = await self._ainvoke(
+            self._synthesis_inputs(topic, brand_info, target_audience, all_results)
+        )
+        
+        await asyncio.to_thread(self._store_research, topic, brand_info, target_audience, research_report, all_results)
+        result = self._research_result(topic, brand_info, target_audience, research_report, all_results)
+        result["search_cache"] = self._report_cache_usage(cache_usage)
+        return result
+
+    def _start_research(self, topic: str, brand_info: str, target_audience: str) -> List[str]:
+        """Print the research banner and return the search queries to run"""
         print(f"\n🔍 Starting comprehensive research on: {topic}")
         print(f"📊 Brand: {brand_info}")
         print(f"👥 Target Audience: {target_audience}\n")
         
         # Generate search queries
-        search_queries = self.generate_search_queries(topic, brand_info, target_audience)
-        
-        # Conduct searches
+        return self.generate_search_queries(topic, brand_info, target_audience)
+
+    def _gather_results(self, search_queries: List[str], per_query: List[List[dict]]) -> List[dict]:
+        """
+        Flatten per-query results in query order, reporting each query, and
+        drop results that repeat a source or near-duplicate its content
+        (the queries overlap), so only distinct sources reach synthesis
+        """
         all_results = []
-        for i, query in enumerate(search_queries, 1):
-            print(f"Searching [{i}/{len(search_queries)}]: {query}")
-            results = self.search_tools.smart_search(query, max_results=3)
+        for i, (query, results) in enumerate(zip(search_queries, per_query), 1):
+            print(f"Searched [{i}/{len(search_queries)}]: {query}")
             all_results.extend(results)
             print(f"  ✓ Found {len(results)} results")
-        
-        print(f"\n✅ Total results gathered: {len(all_results)}")
-        
+        distinct = dedupe_results(all_results)
+        if len(distinct) < len(all_results):
+            print(f"🧹 Removed {len(all_results) - len(distinct)} duplicate results")
+        return distinct
+
+    def _report_cache_usage(self, cache_usage) -> dict:
+        """Print and return this run's search cache hit counts"""
+        usage = cache_usage.summary()
+        if usage["hits"] or usage["stale_hits"] or usage["misses"]:
+            print(f"💾 Search cache: {usage['hits']} fresh, {usage['stale_hits']} stale, "
+                  f"{usage['misses']} misses ({usage['hit_rate']:.0%} hit rate)")
+        return usage
+
+    def _cached_research(self, topic: str, brand_info: str, target_audience: str) -> Optional[dict]:
+        """
+        Result of earlier research on a near-identical topic for the same
+        brand and audience, skipping search and synthesis
+        """
+        if self.semantic_cache is None:
+            return None
+        match = self.semantic_cache.lookup(
+            topic, scope=request_scope(brand_info=brand_info, target_audience=target_audience)
+        )
+        if match is None:
+            return None
+        print(f"♻️  Reusing research from a similar brief (similarity {match['similarity']:.2f})")
+        result = self._research_result(
+            topic, brand_info, target_audience, match["value"]["research_report"], match["value"]["raw_results"]
+        )
+        result["semantic_match"] = {"similarity": match["similarity"], "request": match["text"]}
+        return result
+
+    def _store_research(self, topic: str, brand_info: str, target_audience: str,
+                        research_report: str, all_results: List[dict]):
+        if self.semantic_cache is not None:
+            self.semantic_cache.store(
+                topic,
+                {"research_report": research_report, "raw_results": all_results},
+                scope=request_scope(brand_info=brand_info, target_audience=target_audience)
+            )
+
+    def _synthesis_inputs(self, topic: str, brand_info: str, target_audience: str,
+                          all_results: List[dict]) -> dict:
         # Format results for LLM
-        formatted_results = self._format_search_results(all_results)
-        
-        # Synthesize research
-        print("\n🧠 Synthesizing research insights...")
-        research_report = self.chain.invoke({
+        return {
             "topic": topic,
             "brand_info": brand_info,
             "target_audience": target_audience,
-            "search_results": formatted_results
-        })
-        
+            "search_results": self._format_search_results(all_results, f"{topic} {target_audience}")
+        }
+
+    def _research_result(self, topic: str, brand_info: str, target_audience: str,
+                         research_report: str, all_results: List[dict]) -> dict:
         return {
             "success": True,
             "topic": topic,
@@ -111,17 +222,23 @@ class ResearchAgent:
             "total_sources": len(all_results)
         }
     
-    def _format_search_results(self, results: List[dict]) -> str:
+    def _format_search_results(self, results: List[dict], query: str = "") -> str:
         """
-        Format search results for LLM consumption
+        Format search results for LLM consumption: the passages most
+        relevant to `query` (BM25 blended with the provider's score) that
+        fit in search_results_budget tokens, most relevant source first
         """
+        def header(result):
+            return f"Source 00:\nTitle: {result.get('title', 'N/A')}\nURL: {result.get('url', 'N/A')}\nContent:\n---"
+
         formatted = []
-        for i, result in enumerate(results, 1):
+        for i, packed in enumerate(pack_passages(results, query, self.search_results_budget, header), 1):
+            result = packed["result"]
             formatted.append(f"""
 Source {i}:
 Title: {result.get('title', 'N/A')}
 URL: {result.get('url', 'N/A')}
-Content: {result.get('content', 'N/A')[:500]}...
+Content: {packed['content']}
 ---
             """)
         
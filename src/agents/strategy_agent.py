@@ -1,18 +1,25 @@
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from src.agents.base_agent import get_llm  # Add this
-import os
-from dotenv import load_dotenv
+from src.agents.base_agent import BaseAgent, get_llm, get_provider
+from src.utils.semantic_cache import request_scope, semantic_cache
+from typing import Optional
+import asyncio
 
-load_dotenv()
 
-class StrategyAgent:
+class StrategyAgent(BaseAgent):
     """
     Creates platform-specific content strategies based on research
     """
     
+    backends = ("ollama", "groq")
+    
     def __init__(self):
-        self.llm = get_llm(temperature=0.3, use_local=True)
+        self.llm = get_llm(temperature=0.3, use_local=True, cache=self.caches_responses)
+        self.provider = get_provider(use_local=True)
+        
+        # Reuses strategies made for near-identical briefs over the same
+        # research (None when disabled)
+        self.semantic_cache = semantic_cache("strategy")
         
         self.strategy_prompt = PromptTemplate(
             input_variables=["research_report", "brand_info", "topic", "target_audience", "brand_tone"],
@@ -81,28 +88,102 @@ class StrategyAgent:
         Generate comprehensive content strategy
         """
         print("\n📋 Creating content strategy...")
+        cached = self._cached_strategy(research_report, brand_info, topic, target_audience, brand_tone)
+        if cached is not None:
+            return cached
         
         try:
-            strategy = self.chain.invoke({
-                "research_report": research_report,
-                "brand_info": brand_info,
-                "topic": topic,
-                "target_audience": target_audience,
-                "brand_tone": brand_tone
-            })
-            
-            print("✅ Strategy created successfully!")
-            
+            strategy = self._invoke(self._inputs(
+                research_report, brand_info, topic, target_audience, brand_tone
+            ))
+            self._store_strategy(strategy, research_report, brand_info, topic, target_audience, brand_tone)
+            return self._strategy_result(strategy, brand_info, topic, target_audience, brand_tone)
+        except Exception as e:
             return {
-                "success": True,
-                "strategy": strategy,
-                "brand_info": brand_info,
-                "topic": topic,
-                "target_audience": target_audience,
-                "brand_tone": brand_tone
+                "success": False,
+                "error": str(e)
             }
+
+    async def acreate_strategy(self,
+                               research_report: str,
+                               brand_info: str,
+                               topic: str,
+                               target_audience: str,
+                               brand_tone: str = "Professional but approachable") -> dict:
+        """
+        Async counterpart of create_strategy()
+        """
+        print("\n📋 Creating content strategy...")
+        cached = await asyncio.to_thread(
+            self._cached_strategy, research_report, brand_info, topic, target_audience, brand_tone
+        )
+        if cached is not None:
+            return cached
+        
+        try:
+            strategy = await self._ainvoke(self._inputs(
+                research_report, brand_info, topic, target_audience, brand_tone
+            ))
+            await asyncio.to_thread(
+                self._store_strategy, strategy, research_report, brand_info, topic, target_audience, brand_tone
+            )
+            return self._strategy_result(strategy, brand_info, topic, target_audience, brand_tone)
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
+
+    def _inputs(self, research_report: str, brand_info: str, topic: str,
+                target_audience: str, brand_tone: str) -> dict:
+        return {
+            "research_report": research_report,
+            "brand_info": brand_info,
+            "topic": topic,
+            "target_audience": target_audience,
+            "brand_tone": brand_tone
+        }
+
+    def _cached_strategy(self, research_report: str, brand_info: str, topic: str,
+                         target_audience: str, brand_tone: str) -> Optional[dict]:
+        """
+        Strategy made earlier for a near-identical brief. Only briefs built on
+        the very same research report match, so fresh research always gets a
+        fresh strategy.
+        """
+        if self.semantic_cache is None:
+            return None
+        match = self.semantic_cache.lookup(
+            topic,
+            scope=request_scope(research_report=research_report, brand_info=brand_info,
+                                target_audience=target_audience, brand_tone=brand_tone)
+        )
+        if match is None:
+            return None
+        print(f"♻️  Reusing strategy from a similar brief (similarity {match['similarity']:.2f})")
+        result = self._strategy_result(match["value"], brand_info, topic, target_audience, brand_tone)
+        result["semantic_match"] = {"similarity": match["similarity"], "request": match["text"]}
+        return result
+
+    def _store_strategy(self, strategy: str, research_report: str, brand_info: str, topic: str,
+                        target_audience: str, brand_tone: str):
+        if self.semantic_cache is not None:
+            self.semantic_cache.store(
+                topic,
+                strategy,
+                scope=request_scope(research_report=research_report, brand_info=brand_info,
+                                    target_audience=target_audience, brand_tone=brand_tone)
+            )
+
+    def _strategy_result(self, strategy: str, brand_info: str, topic: str,
+                         target_audience: str, brand_tone: str) -> dict:
+        print("✅ Strategy created successfully!")
+        
+        return {
+            "success": True,
+            "strategy": strategy,
+            "brand_info": brand_info,
+            "topic": topic,
+            "target_audience": target_audience,
+            "brand_tone": brand_tone
+        }
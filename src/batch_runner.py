@@ -0,0 +1,254 @@
+"""
+Batch campaign runner: streams briefs from a JSONL file through
+ContentCreationOrchestrator with bounded concurrency.
+
+Each input line is a JSON object with brand_info, industry, target_audience,
+topic and brand_tone (plus an optional "id"). Each finished campaign is
+written to the output JSONL as soon as it completes.
+
+Usage:
+    python -m src.batch_runner briefs.jsonl -o results.jsonl -c 4
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Iterator, List, Optional, TextIO
+
+from src.orchestrator import ContentCreationOrchestrator
+from src.utils.instrumentation import merge_timings
+from src.utils.llm_cache import llm_cache_stats
+from src.utils.resilience import resilience_stats
+from src.utils.router import backend_router
+from src.utils.search_cache import search_cache_stats
+from src.utils.semantic_cache import semantic_cache_stats
+from src.utils.single_flight import single_flight_stats
+
+BRIEF_FIELDS = ("brand_info", "industry", "target_audience", "topic", "brand_tone")
+
+
+def read_briefs(path: str) -> Iterator[dict]:
+    """
+    Yield briefs one at a time so large files are never loaded whole. A
+    line that isn't a valid brief (bad JSON, not an object, missing fields)
+    comes out as a failure record, {"id", "success": False, "invalid": True,
+    "error"}, for the caller to write in place of a result.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                brief = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield _invalid_brief(str(line_number), f"Brief on line {line_number} is not valid JSON: {e}")
+                continue
+            if not isinstance(brief, dict):
+                yield _invalid_brief(str(line_number), f"Brief on line {line_number} is not a JSON object")
+                continue
+            brief.setdefault("id", str(line_number))
+            missing = [field for field in BRIEF_FIELDS if field not in brief]
+            if missing:
+                yield _invalid_brief(brief["id"], f"Brief on line {line_number} is missing: {', '.join(missing)}")
+                continue
+            yield brief
+
+
+def _invalid_brief(brief_id: str, error: str) -> dict:
+    print(f"⚠️  Skipping brief {brief_id}: {error}")
+    return {"id": brief_id, "success": False, "invalid": True, "error": error}
+
+
+class BatchStats:
+    """
+    Collects per-campaign results for the end-of-run report. Invalid brief
+    lines are counted apart: no campaign ran, so they aren't campaigns and
+    don't count towards throughput.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.failed = 0
+        self.invalid = 0
+        self.campaign_seconds: List[float] = []
+        self.timings: dict = {}
+
+    def record(self, record: dict):
+        if record.get("invalid"):
+            self.invalid += 1
+            return
+        if not record["success"]:
+            self.failed += 1
+            return
+        self.completed += 1
+        self.campaign_seconds.append(record["elapsed"])
+        self.timings = merge_timings(self.timings, record.get("timings", {}))
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self.started
+        total = self.completed + self.failed
+        return {
+            "campaigns": total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "invalid": self.invalid,
+            "wall_seconds": round(wall, 2),
+            "campaigns_per_minute": round(total / wall * 60, 2) if wall > 0 else 0.0,
+            "campaign_latency": _summarize(self.campaign_seconds),
+            "stage_latency": {
+                node: _summarize(durations)
+                for node, durations in sorted(self.timings.get("nodes", {}).items())
+            },
+            "llm_latency": {
+                agent: _summarize(durations)
+                for agent, durations in sorted(self.timings.get("llm", {}).items())
+            },
+            "search_latency": {
+                provider: _summarize(durations)
+                for provider, durations in sorted(self.timings.get("search", {}).items())
+            },
+            "queue_wait": {
+                model: _summarize(durations)
+                for model, durations in sorted(self.timings.get("queue", {}).items())
+            },
+            "retries": dict(self.timings.get("retries", {})),
+            "llm_cache": llm_cache_stats(),
+            "search_cache": search_cache_stats(),
+            "semantic_cache": semantic_cache_stats(),
+            "routing": backend_router().stats(),
+            "resilience": resilience_stats(),
+            "single_flight": single_flight_stats(),
+        }
+
+
+def _summarize(durations: List[float]) -> dict:
+    if not durations:
+        return {}
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+async def _run_campaign(orchestrator: ContentCreationOrchestrator, brief: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        final_state = await orchestrator.arun(**{field: brief[field] for field in BRIEF_FIELDS})
+        return {
+            "id": brief["id"],
+            "success": True,
+            "elapsed": time.perf_counter() - started,
+            **final_state,
+        }
+    except Exception as e:
+        return {
+            "id": brief["id"],
+            "success": False,
+            "elapsed": time.perf_counter() - started,
+            "error": str(e),
+        }
+
+
+async def run_batch(input_path: str, output: TextIO, concurrency: int = 4,
+                    orchestrator: Optional[ContentCreationOrchestrator] = None) -> dict:
+    """
+    Run every brief in `input_path`, keeping at most `concurrency` campaigns
+    in flight. Results are written to `output` in completion order.
+    Returns the throughput / latency report.
+    """
+    orchestrator = orchestrator or ContentCreationOrchestrator()
+    stats = BatchStats()
+    briefs = read_briefs(input_path)
+    in_flight = set()
+
+    def write(record: dict):
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+        stats.record(record)
+
+    for brief in briefs:
+        if "success" in brief:
+            # A line read_briefs() couldn't parse; record it and move on
+            write(brief)
+            continue
+        if len(in_flight) >= concurrency:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                write(task.result())
+        in_flight.add(asyncio.create_task(_run_campaign(orchestrator, brief)))
+
+    while in_flight:
+        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            write(task.result())
+
+    return stats.report()
+
+
+def print_report(report: dict):
+    print("\n" + "="*80)
+    print("📦 BATCH COMPLETE")
+    print("="*80)
+    print(f"  • Campaigns: {report['campaigns']} ({report['completed']} completed, {report['failed']} failed)")
+    if report["invalid"]:
+        print(f"  • Invalid briefs skipped: {report['invalid']}")
+    print(f"  • Wall time: {report['wall_seconds']:.1f}s")
+    print(f"  • Throughput: {report['campaigns_per_minute']:.2f} campaigns/minute")
+    if report["campaign_latency"]:
+        latency = report["campaign_latency"]
+        print(f"  • Campaign latency: mean {latency['mean']:.1f}s, p95 {latency['p95']:.1f}s")
+    for title, key in (("Per-stage latency", "stage_latency"),
+                       ("LLM latency by agent", "llm_latency"),
+                       ("Search latency by provider", "search_latency"),
+                       ("Rate-limit waits by model", "queue_wait")):
+        if not report[key]:
+            continue
+        print(f"\n⏱️  {title} (seconds):")
+        for name, latency in report[key].items():
+            print(f"  {name:<22} n={latency['count']:<4} mean={latency['mean']:<8} "
+                  f"p50={latency['p50']:<8} p95={latency['p95']:<8} max={latency['max']}")
+    if report["retries"]:
+        print("\n🔄 Retries:")
+        for name, count in sorted(report["retries"].items()):
+            print(f"  {name:<22} {count}")
+    if report["llm_cache"]:
+        cache = report["llm_cache"]
+        print(f"\n💾 LLM cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%} hit rate)")
+    if report["search_cache"]:
+        cache = report["search_cache"]
+        print(f"💾 Search cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%} hit rate)")
+    for namespace, cache in report["semantic_cache"].items():
+        print(f"🧭 Semantic {namespace} cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%} hit rate)")
+    for backend, routing in report["routing"].items():
+        print(f"🔀 {backend}: {routing['routed']} calls routed, mean latency {routing['mean_latency']}s, "
+              f"error rate {routing['error_rate']:.0%}")
+    for name, flights in report["single_flight"].items():
+        print(f"🪁 Coalesced {name} calls: {flights['shared']} shared, {flights['calls']} made")
+    resilience = report["resilience"]
+    for backend, breaker in resilience["breakers"].items():
+        print(f"🛡️  {backend} circuit {breaker['state']} (opened {breaker['times_opened']}x), "
+              f"{resilience['fallbacks'].get(backend, 0)} fallback calls")
+    print("="*80)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run many content campaigns from a JSONL file of briefs")
+    parser.add_argument("input", help="JSONL file, one brief per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="Output JSONL path")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Campaigns to run at once")
+    args = parser.parse_args(argv)
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        report = asyncio.run(run_batch(args.input, output, args.concurrency))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,13 @@
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-import os
-from dotenv import load_dotenv
+from src.agents.base_agent import BaseAgent, get_llm, get_provider
 
-load_dotenv()
-
-class ContentAnalyzer:
+class ContentAnalyzer(BaseAgent):
     def __init__(self):
-        # Initialize Groq LLM with current available models
-        self.llm = ChatGroq(
-            temperature=0.3,
-            model_name="llama-3.1-8b-instant",  # Updated current model
-            groq_api_key=os.getenv("GROQ_API_KEY")
-        )
+        # Shared Groq LLM from the client registry. Its SDK retries are off, so
+        # calls go through BaseAgent._invoke for retries, breaker and rate limits
+        self.llm = get_llm(temperature=0.3, use_local=False, cache=self.caches_responses)
+        self.provider = get_provider(use_local=False)
         
         # Define analysis prompt
         self.analysis_prompt = PromptTemplate(
@@ -43,7 +37,7 @@ class ContentAnalyzer:
         Analyzes content and returns structured insights
         """
         try:
-            analysis_text = self.chain.invoke({"content": content})
+            analysis_text = self._invoke({"content": content})
             
             return {
                 "success": True,
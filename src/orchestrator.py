@@ -1,19 +1,74 @@
-from typing import TypedDict, Annotated
-from langgraph.graph import StateGraph, END
+from typing import TypedDict, Annotated, AsyncIterator, Dict, Iterator, Optional
+from contextlib import contextmanager
+from functools import lru_cache
+import asyncio
+import contextvars
+import importlib
 import operator
+import os
+import queue
+import threading
+import time
+import uuid
 
-from src.agents.research_agent import ResearchAgent
-from src.agents.strategy_agent import StrategyAgent
-from src.agents.enhanced_platform_agents import (
-    EnhancedTwitterAgent,
-    EnhancedLinkedInAgent,
-    EnhancedInstagramAgent,
-    NewsletterAgent
+# Agents, LangGraph and the provider SDKs are imported on first use, so
+# importing this module (e.g. for a CLI's --help) stays cheap
+from src.utils.concurrency import ProviderLimiter, map_concurrently
+from src.utils.env import getenv
+from src.utils.instrumentation import (
+    collecting,
+    default_profile_dir,
+    merge_timings,
+    profiled,
+    record_retry,
 )
-from src.agents.quality_agent import QualityAgent
+from src.utils.streaming import (
+    NodeFinished,
+    NodeStarted,
+    RunCompleted,
+    StreamEvent,
+    emit,
+    event_sink,
+    node_scope,
+)
+
+PLATFORMS = ("twitter", "linkedin", "instagram", "newsletter")
+PLATFORM_LABELS = {
+    "twitter": "Twitter",
+    "linkedin": "LinkedIn",
+    "instagram": "Instagram",
+    "newsletter": "Newsletter",
+}
+PLATFORM_ICONS = {"twitter": "🐦", "linkedin": "💼", "instagram": "📸", "newsletter": "📧"}
+
+# Offsets from an agent's own temperature for best-of-N candidates, in order
+_CANDIDATE_OFFSETS = (0.0, 0.2, -0.2, 0.4, -0.4, 0.3, -0.3, 0.1, -0.1)
+
+
+def candidate_temperatures(base: float, n: int) -> list:
+    """
+    Sampling temperatures for n candidates: the agent's own first, then
+    alternately warmer and cooler, kept within [0.1, 1.0]. Offsets that
+    would land on an already used temperature are skipped.
+    """
+    temperatures = []
+    for offset in _CANDIDATE_OFFSETS:
+        temperature = round(min(1.0, max(0.1, base + offset)), 2)
+        if temperature not in temperatures:
+            temperatures.append(temperature)
+        if len(temperatures) == n:
+            break
+    # More candidates than distinct temperatures: repeat them in order
+    while len(temperatures) < n:
+        temperatures.append(temperatures[len(temperatures) % len(temperatures)])
+    return temperatures
+
 
 # Define the state that flows through the graph
 class ContentCreationState(TypedDict):
+    # Checkpoint thread id, pass back as run(..., resume_id=...) to continue
+    run_id: str
+
     # Inputs
     brand_info: str
     industry: str
@@ -48,64 +103,251 @@ class ContentCreationState(TypedDict):
     linkedin_attempts: list
     instagram_attempts: list
     newsletter_attempts: list
+
+    # Best-of-N drafts from the generation nodes, waiting for quality check
+    twitter_candidates: list
+    linkedin_candidates: list
+    instagram_candidates: list
+    newsletter_candidates: list
+
+    # Seconds per node run, LLM call (by agent) and search (by provider), plus
+    # retry counters: {"nodes": {...}, "llm": {...}, "search": {...}, "retries": {...}}
+    timings: Annotated[dict, merge_timings]
     
 
-class ContentCreationOrchestrator:
+# The compiled graph is shared by every orchestrator; its nodes run on
+# whichever orchestrator is driving the current run
+_current_orchestrator = contextvars.ContextVar("orchestrator")
+
+# Default for constructor settings that are read from the environment
+_FROM_ENV = object()
+
+
+class _lazy:
+    """
+    Like functools.cached_property, but the value is built under the
+    instance's lock so threads racing on first use share one instance
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.__doc__ = factory.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._lazy_lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
+
+
+def _lazy_agent(module: str, class_name: str) -> _lazy:
     """
-    LangGraph-based orchestrator for the entire content creation pipeline
+    An orchestrator attribute that imports and builds the agent on first use.
+    The agent's LLM calls share the orchestrator's provider limiter.
+    """
+    def build(orchestrator):
+        agent = getattr(importlib.import_module(module), class_name)()
+        agent.limiter = orchestrator.limiter
+        return agent
+    return _lazy(build)
+
+
+def _graph_node(name: str, func, afunc):
     """
+    Graph node running func(orchestrator, state) / afunc(orchestrator, state)
+    on the orchestrator driving the current run
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    def node(state: ContentCreationState) -> dict:
+        return _current_orchestrator.get()._run_node(name, func, state)
+
+    async def anode(state: ContentCreationState) -> dict:
+        return await _current_orchestrator.get()._arun_node(name, afunc, state)
+
+    return RunnableLambda(node, afunc=anode)
+
+
+def _route_after_quality_check(state: ContentCreationState) -> str:
+    return _current_orchestrator.get()._should_retry(state)
+
+
+@lru_cache(maxsize=None)
+def compiled_workflow():
+    """
+    Build and compile the LangGraph workflow once per process. Every node
+    has a sync and an async implementation so the same graph serves both
+    run() and arun(); orchestrators attach their own checkpointer to a copy.
+    """
+    from langgraph.graph import StateGraph, END
+
+    Orchestrator = ContentCreationOrchestrator
+    workflow = StateGraph(ContentCreationState)
     
-    def __init__(self):
-        self.research_agent = ResearchAgent()
-        self.strategy_agent = StrategyAgent()
-        self.twitter_agent = EnhancedTwitterAgent()
-        self.linkedin_agent = EnhancedLinkedInAgent()
-        self.instagram_agent = EnhancedInstagramAgent()
-        self.newsletter_agent = NewsletterAgent()
-        self.quality_agent = QualityAgent()
-        
-        # Build the workflow graph
-        self.workflow = self._build_workflow()
+    # Add nodes (each agent is a node)
+    workflow.add_node("research", _graph_node("research", Orchestrator._research_node, Orchestrator._aresearch_node))
+    workflow.add_node("strategy", _graph_node("strategy", Orchestrator._strategy_node, Orchestrator._astrategy_node))
+    for platform in PLATFORMS:
+        workflow.add_node(f"generate_{platform}", _graph_node(
+            f"generate_{platform}",
+            lambda orchestrator, state, platform=platform: orchestrator._generate_node(platform, state),
+            lambda orchestrator, state, platform=platform: orchestrator._agenerate_node(platform, state),
+        ))
+    workflow.add_node("quality_check", _graph_node("quality_check", Orchestrator._quality_check_node, Orchestrator._aquality_check_node))
+    workflow.add_node(
+        "regenerate_content",  # New node for retry
+        _graph_node("regenerate_content", Orchestrator._regenerate_content_node, Orchestrator._aregenerate_content_node)
+    )
     
-    def _build_workflow(self):
+    # Define the flow
+    workflow.set_entry_point("research")
+    workflow.add_edge("research", "strategy")
+    
+    # Fan out to one generation branch per platform, then join at quality check
+    generate_nodes = [f"generate_{platform}" for platform in PLATFORMS]
+    for node in generate_nodes:
+        workflow.add_edge("strategy", node)
+    workflow.add_edge(generate_nodes, "quality_check")
+    
+    # Conditional edge: if quality is good, end; otherwise retry content generation only
+    workflow.add_conditional_edges(
+        "quality_check",
+        _route_after_quality_check,
+        {
+            "end": END,
+            "retry": "regenerate_content"  # Skip research and strategy
+        }
+    )
+    
+    # After regeneration, go back to quality check
+    workflow.add_edge("regenerate_content", "quality_check")
+    
+    return workflow.compile()
+
+
+class ContentCreationOrchestrator:
+    """
+    LangGraph-based orchestrator for the entire content creation pipeline.
+    Agents (and their LLM clients) are built the first time a run needs them.
+    """
+
+    research_agent = _lazy_agent("src.agents.research_agent", "ResearchAgent")
+    strategy_agent = _lazy_agent("src.agents.strategy_agent", "StrategyAgent")
+    twitter_agent = _lazy_agent("src.agents.enhanced_platform_agents", "EnhancedTwitterAgent")
+    linkedin_agent = _lazy_agent("src.agents.enhanced_platform_agents", "EnhancedLinkedInAgent")
+    instagram_agent = _lazy_agent("src.agents.enhanced_platform_agents", "EnhancedInstagramAgent")
+    newsletter_agent = _lazy_agent("src.agents.enhanced_platform_agents", "NewsletterAgent")
+    quality_agent = _lazy_agent("src.agents.quality_agent", "QualityAgent")
+    
+    def __init__(self, max_concurrency_per_provider: Optional[Dict[str, int]] = None,
+                 checkpoint_path: Optional[str] = _FROM_ENV,
+                 profile_dir: Optional[str] = _FROM_ENV,
+                 candidates_per_platform: Optional[int] = None,
+                 batch_evaluation: Optional[bool] = None):
         """
-        Build the LangGraph workflow
+        max_concurrency_per_provider: caps on simultaneous LLM calls per
+        provider, e.g. {"groq": 2, "ollama": 1}. Defaults come from the
+        GROQ_MAX_CONCURRENCY / OLLAMA_MAX_CONCURRENCY env vars.
+        checkpoint_path: SQLite file the graph checkpoints to after every
+        step (CHECKPOINT_DB env var); None disables checkpointing and resume,
+        as does a missing langgraph-checkpoint-sqlite package (with a warning).
+        A run's checkpoints are deleted once it completes, since only failed
+        runs are resumed; set CHECKPOINT_KEEP_COMPLETED=1 to keep them.
+        profile_dir: when set (or PROFILE_DIR env var), every node runs under
+        cProfile and dumps <profile_dir>/<run_id>/<node>-<n>.prof. The
+        platform branches then run one at a time so each gets its own profile
+        candidates_per_platform: drafts generated per platform in the first
+        pass, concurrently and at varied temperatures (CANDIDATES_PER_PLATFORM
+        env var, default 1). All are scored and the best one is kept, so
+        feedback-driven regeneration only runs when none of them pass.
+        batch_evaluation: score the drafts of a quality check a few per LLM
+        call with QualityAgent.evaluate_batch() instead of one call each
+        (BATCH_EVALUATION env var, default on)
         """
-        workflow = StateGraph(ContentCreationState)
-        
-        # Add nodes (each agent is a node)
-        workflow.add_node("research", self._research_node)
-        workflow.add_node("strategy", self._strategy_node)
-        workflow.add_node("generate_content", self._generate_content_node)
-        workflow.add_node("quality_check", self._quality_check_node)
-        workflow.add_node("regenerate_content", self._regenerate_content_node)  # New node for retry
-        
-        # Define the flow
-        workflow.set_entry_point("research")
-        workflow.add_edge("research", "strategy")
-        workflow.add_edge("strategy", "generate_content")
-        workflow.add_edge("generate_content", "quality_check")
-        
-        # Conditional edge: if quality is good, end; otherwise retry content generation only
-        workflow.add_conditional_edges(
-            "quality_check",
-            self._should_retry,
-            {
-                "end": END,
-                "retry": "regenerate_content"  # Skip research and strategy
-            }
-        )
-        
-        # After regeneration, go back to quality check
-        workflow.add_edge("regenerate_content", "quality_check")
-        
-        return workflow.compile()
+        self._lazy_lock = threading.RLock()
+        self.limiter = ProviderLimiter(max_concurrency_per_provider)
+        if checkpoint_path is _FROM_ENV:
+            from src.utils.checkpointing import default_checkpoint_path
+            checkpoint_path = default_checkpoint_path()
+        self.checkpoint_path = checkpoint_path
+        self.keep_completed_checkpoints = getenv("CHECKPOINT_KEEP_COMPLETED", "0") not in ("0", "false", "off", "")
+        self.profile_dir = default_profile_dir() if profile_dir is _FROM_ENV else profile_dir
+        self.candidates_per_platform = max(1, candidates_per_platform or int(getenv("CANDIDATES_PER_PLATFORM", "1")))
+        if batch_evaluation is None:
+            batch_evaluation = getenv("BATCH_EVALUATION", "1") not in ("0", "false", "off", "")
+        self.batch_evaluation = batch_evaluation
+
+    @_lazy
+    def checkpointer(self):
+        if not self.checkpoint_path:
+            return None
+        from src.utils.checkpointing import open_checkpointer
+        return open_checkpointer(self.checkpoint_path)
+
+    @_lazy
+    def workflow(self):
+        """
+        The shared compiled graph. With checkpointing on, a copy of it that
+        checkpoints after every step, keyed by the run's thread id, so a
+        failed run can resume from the last completed node.
+        """
+        if self.checkpointer is None:
+            return compiled_workflow()
+        return compiled_workflow().copy(update={"checkpointer": self.checkpointer})
+
+    def _platform_agent(self, platform: str):
+        return getattr(self, f"{platform}_agent")
+
+    @contextmanager
+    def _driving(self):
+        """Make this orchestrator the one the shared graph's nodes run on"""
+        token = _current_orchestrator.set(self)
+        try:
+            yield
+        finally:
+            _current_orchestrator.reset(token)
+
+    # Node runs record their wall time, the LLM/search calls made on their
+    # behalf and their retries under `timings`, and emit node started /
+    # finished stream events. Only this run's numbers are written back; the
+    # merge_timings reducer folds them into the existing entries.
+
+    def _run_node(self, name: str, func, state: ContentCreationState) -> dict:
+        emit(NodeStarted(node=name))
+        with collecting() as collector, node_scope(name), profiled(self._profile_path(name, state)):
+            started = time.perf_counter()
+            result = func(self, state)
+        return self._with_timings(name, result, collector, started)
+
+    async def _arun_node(self, name: str, afunc, state: ContentCreationState) -> dict:
+        emit(NodeStarted(node=name))
+        with collecting() as collector, node_scope(name), profiled(self._profile_path(name, state)):
+            started = time.perf_counter()
+            result = await afunc(self, state)
+        return self._with_timings(name, result, collector, started)
+
+    def _with_timings(self, name: str, result: dict, collector, started: float) -> dict:
+        seconds = time.perf_counter() - started
+        collector.add_duration("nodes", name, seconds)
+        emit(NodeFinished(node=name, seconds=seconds))
+        update = dict(result)
+        update["timings"] = collector.timings
+        return update
+
+    def _profile_path(self, name: str, state: ContentCreationState) -> Optional[str]:
+        if not self.profile_dir:
+            return None
+        run = len(state.get("timings", {}).get("nodes", {}).get(name, [])) + 1
+        return os.path.join(self.profile_dir, state.get("run_id") or "run", f"{name}-{run}.prof")
 
     def _research_node(self, state: ContentCreationState) -> ContentCreationState:
         """Research agent node"""
-        print("\n" + "="*80)
-        print("🔍 NODE 1: RESEARCH AGENT")
-        print("="*80)
+        self._print_banner("🔍 NODE 1: RESEARCH AGENT")
         
         result = self.research_agent.conduct_research(
             topic=state["topic"],
@@ -113,7 +355,21 @@ class ContentCreationOrchestrator:
             target_audience=state["target_audience"],
             industry=state["industry"]
         )
+        return self._apply_research(state, result)
+
+    async def _aresearch_node(self, state: ContentCreationState) -> ContentCreationState:
+        """Research agent node (async)"""
+        self._print_banner("🔍 NODE 1: RESEARCH AGENT")
         
+        result = await self.research_agent.aconduct_research(
+            topic=state["topic"],
+            brand_info=state["brand_info"],
+            target_audience=state["target_audience"],
+            industry=state["industry"]
+        )
+        return self._apply_research(state, result)
+
+    def _apply_research(self, state: ContentCreationState, result: dict) -> ContentCreationState:
         state["research_report"] = result["research_report"]
         state["research_sources"] = result["total_sources"]
         
@@ -122,215 +378,219 @@ class ContentCreationOrchestrator:
     
     def _strategy_node(self, state: ContentCreationState) -> ContentCreationState:
         """Strategy agent node"""
-        print("\n" + "="*80)
-        print("📋 NODE 2: STRATEGY AGENT")
-        print("="*80)
+        self._print_banner("📋 NODE 2: STRATEGY AGENT")
         
-        result = self.strategy_agent.create_strategy(
-            research_report=state["research_report"],
-            brand_info=state["brand_info"],
-            topic=state["topic"],
-            target_audience=state["target_audience"],
-            brand_tone=state["brand_tone"]
-        )
+        result = self.strategy_agent.create_strategy(**self._strategy_inputs(state))
+        return self._apply_strategy(state, result)
+
+    async def _astrategy_node(self, state: ContentCreationState) -> ContentCreationState:
+        """Strategy agent node (async)"""
+        self._print_banner("📋 NODE 2: STRATEGY AGENT")
         
+        result = await self.strategy_agent.acreate_strategy(**self._strategy_inputs(state))
+        return self._apply_strategy(state, result)
+
+    def _strategy_inputs(self, state: ContentCreationState) -> dict:
+        return {
+            "research_report": state["research_report"],
+            "brand_info": state["brand_info"],
+            "topic": state["topic"],
+            "target_audience": state["target_audience"],
+            "brand_tone": state["brand_tone"]
+        }
+
+    def _apply_strategy(self, state: ContentCreationState, result: dict) -> ContentCreationState:
         state["strategy"] = result["strategy"]
         
         print("✅ Strategy created")
         return state
     
-    def _generate_content_node(self, state: ContentCreationState) -> ContentCreationState:
-        """Content generation node - all platforms"""
-        print("\n" + "="*80)
-        print("📱 NODE 3: CONTENT GENERATION (All Platforms)")
-        print("="*80)
-        
-        # Generate for all platforms
-        twitter_result = self.twitter_agent.generate(
-            research_report=state["research_report"],
-            strategy=state["strategy"],
-            brand_info=state["brand_info"],
-            topic=state["topic"],
-            brand_tone=state["brand_tone"],
-            feedback=""
-        )
-        state["twitter_content"] = twitter_result["content"]
-        
-        linkedin_result = self.linkedin_agent.generate(
-            research_report=state["research_report"],
-            strategy=state["strategy"],
-            brand_info=state["brand_info"],
-            topic=state["topic"],
-            brand_tone=state["brand_tone"],
-            feedback=""
-        )
-        state["linkedin_content"] = linkedin_result["content"]
-        
-        instagram_result = self.instagram_agent.generate(
-            research_report=state["research_report"],
-            strategy=state["strategy"],
-            brand_info=state["brand_info"],
-            topic=state["topic"],
-            brand_tone=state["brand_tone"],
-            feedback=""
-        )
-        state["instagram_content"] = instagram_result["content"]
-        
-        newsletter_result = self.newsletter_agent.generate(
-            research_report=state["research_report"],
-            strategy=state["strategy"],
-            brand_info=state["brand_info"],
-            topic=state["topic"],
-            brand_tone=state["brand_tone"],
-            feedback=""
+    def _generation_inputs(self, state: ContentCreationState, feedback: str) -> dict:
+        return {
+            "research_report": state["research_report"],
+            "strategy": state["strategy"],
+            "brand_info": state["brand_info"],
+            "topic": state["topic"],
+            "brand_tone": state["brand_tone"],
+            "feedback": feedback
+        }
+
+    def _generate_platform(self, platform: str, state: ContentCreationState, feedback: str = "",
+                           temperature: Optional[float] = None) -> str:
+        """Generate content for one platform"""
+        agent = self._platform_agent(platform)
+        result = agent.generate(**self._generation_inputs(state, feedback), temperature=temperature)
+        return result["content"]
+
+    async def _agenerate_platform(self, platform: str, state: ContentCreationState, feedback: str = "",
+                                  temperature: Optional[float] = None) -> str:
+        """Async counterpart of _generate_platform()"""
+        agent = self._platform_agent(platform)
+        result = await agent.agenerate(**self._generation_inputs(state, feedback), temperature=temperature)
+        return result["content"]
+
+    def _candidate_temperatures(self, platform: str) -> list:
+        return candidate_temperatures(self._platform_agent(platform).llm.temperature, self.candidates_per_platform)
+
+    def _generate_node(self, platform: str, state: ContentCreationState) -> dict:
+        """
+        Content generation node for a single platform. The four generation
+        nodes run as parallel branches, so each returns only its own keys.
+        With candidates_per_platform > 1 the node drafts that many versions
+        concurrently, one per temperature; quality check keeps the best.
+        """
+        print(f"\n📱 NODE 3: CONTENT GENERATION ({PLATFORM_LABELS[platform]})")
+        candidates = map_concurrently(
+            lambda temperature: self._generate_platform(platform, state, temperature=temperature),
+            self._candidate_temperatures(platform)
         )
-        state["newsletter_content"] = newsletter_result["content"]
-        
-        print("✅ All platform content generated")
-        return state
+        return {f"{platform}_content": candidates[0], f"{platform}_candidates": candidates}
+
+    async def _agenerate_node(self, platform: str, state: ContentCreationState) -> dict:
+        """Content generation node for a single platform (async)"""
+        print(f"\n📱 NODE 3: CONTENT GENERATION ({PLATFORM_LABELS[platform]})")
+        candidates = await asyncio.gather(*(
+            self._agenerate_platform(platform, state, temperature=temperature)
+            for temperature in self._candidate_temperatures(platform)
+        ))
+        return {f"{platform}_content": candidates[0], f"{platform}_candidates": list(candidates)}
+    
+    def _evaluation_inputs(self, platform: str, content: str, state: ContentCreationState) -> dict:
+        return {
+            "platform": PLATFORM_LABELS[platform],
+            "content": content,
+            "strategy": state["strategy"],
+            "brand_tone": state["brand_tone"]
+        }
+
+    def _pending_drafts(self, state: ContentCreationState) -> list:
+        """
+        (platform, content) pairs to evaluate, in platform order: every
+        first-pass candidate, or the current content after a regeneration
+        """
+        return [
+            (platform, content)
+            for platform in PLATFORMS
+            for content in (state.get(f"{platform}_candidates") or [state[f"{platform}_content"]])
+        ]
+
+    def _evaluate_platform(self, platform: str, content: str, state: ContentCreationState) -> dict:
+        """Evaluate one platform draft"""
+        return self.quality_agent.evaluate(**self._evaluation_inputs(platform, content, state))
+
+    async def _aevaluate_platform(self, platform: str, content: str, state: ContentCreationState) -> dict:
+        """Async counterpart of _evaluate_platform()"""
+        return await self.quality_agent.aevaluate(**self._evaluation_inputs(platform, content, state))
     
     def _quality_check_node(self, state: ContentCreationState) -> ContentCreationState:
         """Quality evaluation node"""
-        print("\n" + "="*80)
-        print("✅ NODE 4: QUALITY EVALUATION")
-        print("="*80)
-        
-        # Evaluate each platform
-        state["twitter_quality"] = self.quality_agent.evaluate(
-            platform="Twitter",
-            content=state["twitter_content"],
-            strategy=state["strategy"],
-            brand_tone=state["brand_tone"]
-        )
-        state["twitter_attempts"].append({
-            "content": state["twitter_content"],
-            "score": state["twitter_quality"]["overall_score"]
-        })
-        print(f"  Twitter: {state['twitter_quality']['overall_score']:.1f}/10 - {state['twitter_quality']['recommendation']}")
-        
-        state["linkedin_quality"] = self.quality_agent.evaluate(
-            platform="LinkedIn",
-            content=state["linkedin_content"],
-            strategy=state["strategy"],
-            brand_tone=state["brand_tone"]
-        )
-        state["linkedin_attempts"].append({
-            "content": state["linkedin_content"],
-            "score": state["linkedin_quality"]["overall_score"]
-        })
-        print(f"  LinkedIn: {state['linkedin_quality']['overall_score']:.1f}/10 - {state['linkedin_quality']['recommendation']}")
-        
-        state["instagram_quality"] = self.quality_agent.evaluate(
-            platform="Instagram",
-            content=state["instagram_content"],
-            strategy=state["strategy"],
-            brand_tone=state["brand_tone"]
-        )
-        state["instagram_attempts"].append({
-            "content": state["instagram_content"],
-            "score": state["instagram_quality"]["overall_score"]
-        })
-        print(f"  Instagram: {state['instagram_quality']['overall_score']:.1f}/10 - {state['instagram_quality']['recommendation']}")
+        self._print_banner("✅ NODE 4: QUALITY EVALUATION")
         
-        state["newsletter_quality"] = self.quality_agent.evaluate(
-            platform="Newsletter",
-            content=state["newsletter_content"],
-            strategy=state["strategy"],
-            brand_tone=state["brand_tone"]
-        )
-        state["newsletter_attempts"].append({
-            "content": state["newsletter_content"],
-            "score": state["newsletter_quality"]["overall_score"]
-        })
-        print(f"  Newsletter: {state['newsletter_quality']['overall_score']:.1f}/10 - {state['newsletter_quality']['recommendation']}")
+        drafts = self._pending_drafts(state)
+        if self.batch_evaluation:
+            evaluations = self.quality_agent.evaluate_batch(
+                self._labelled(drafts), state["strategy"], state["brand_tone"]
+            )
+        else:
+            # Evaluate every draft concurrently; the provider limiter bounds the pool
+            evaluations = map_concurrently(lambda draft: self._evaluate_platform(*draft, state), drafts)
+        return self._apply_evaluations(state, drafts, evaluations)
+
+    async def _aquality_check_node(self, state: ContentCreationState) -> ContentCreationState:
+        """Quality evaluation node (async)"""
+        self._print_banner("✅ NODE 4: QUALITY EVALUATION")
+        
+        drafts = self._pending_drafts(state)
+        if self.batch_evaluation:
+            evaluations = await self.quality_agent.aevaluate_batch(
+                self._labelled(drafts), state["strategy"], state["brand_tone"]
+            )
+        else:
+            evaluations = await asyncio.gather(
+                *(self._aevaluate_platform(platform, content, state) for platform, content in drafts)
+            )
+        return self._apply_evaluations(state, drafts, evaluations)
+
+    @staticmethod
+    def _labelled(drafts: list) -> list:
+        """(platform label, content) pairs as the quality agent takes them"""
+        return [(PLATFORM_LABELS[platform], content) for platform, content in drafts]
+
+    def _apply_evaluations(self, state: ContentCreationState, drafts: list, evaluations: list) -> ContentCreationState:
+        # Merge results back in draft order so attempts stay deterministic
+        scored = {platform: [] for platform in PLATFORMS}
+        for (platform, content), quality in zip(drafts, evaluations):
+            state[f"{platform}_attempts"].append({
+                "content": content,
+                "score": quality["overall_score"],
+                "approved": quality["approved"]
+            })
+            scored[platform].append((content, quality))
+
+        for platform in PLATFORMS:
+            # Keep the best candidate, approved ones first; ties go to the earliest
+            content, quality = max(scored[platform], key=lambda item: (item[1]["approved"], item[1]["overall_score"]))
+            state[f"{platform}_content"] = content
+            state[f"{platform}_quality"] = quality
+            state[f"{platform}_candidates"] = []
+            cached = " (cached)" if quality.get("cached") else " (pre-screen)" if quality.get("prescreened") else ""
+            best_of = f" (best of {len(scored[platform])})" if len(scored[platform]) > 1 else ""
+            print(f"  {PLATFORM_LABELS[platform]}: {quality['overall_score']:.1f}/10 - {quality['recommendation']}{best_of}{cached}")
         
         # Check if all approved
-        state["all_approved"] = all([
-            state["twitter_quality"]["approved"],
-            state["linkedin_quality"]["approved"],
-            state["instagram_quality"]["approved"],
-            state["newsletter_quality"]["approved"]
-        ])
+        state["all_approved"] = all(
+            state[f"{platform}_quality"]["approved"] for platform in PLATFORMS
+        )
         
         return state
     
     def _regenerate_content_node(self, state: ContentCreationState) -> ContentCreationState:
         """Regenerate only failed content (skip research and strategy)"""
-        
+        failed = self._start_regeneration(state)
+        
+        # Only regenerate platforms that failed, concurrently (capped per provider)
+        def regenerate(platform):
+            print(f"  {PLATFORM_ICONS[platform]} Regenerating {PLATFORM_LABELS[platform]}...")
+            record_retry(f"generate_{platform}")
+            feedback = state[f"{platform}_quality"].get("feedback", "")
+            return self._generate_platform(platform, state, feedback=feedback)
+
+        return self._apply_regeneration(state, failed, map_concurrently(regenerate, failed))
+
+    async def _aregenerate_content_node(self, state: ContentCreationState) -> ContentCreationState:
+        """Regenerate only failed content (async)"""
+        failed = self._start_regeneration(state)
+        
+        async def regenerate(platform):
+            print(f"  {PLATFORM_ICONS[platform]} Regenerating {PLATFORM_LABELS[platform]}...")
+            record_retry(f"generate_{platform}")
+            feedback = state[f"{platform}_quality"].get("feedback", "")
+            return await self._agenerate_platform(platform, state, feedback=feedback)
+
+        contents = await asyncio.gather(*(regenerate(platform) for platform in failed))
+        return self._apply_regeneration(state, failed, contents)
+
+    def _start_regeneration(self, state: ContentCreationState) -> list:
+        """Bump the retry count, report and return the platforms that failed"""
         # Increment retry count
         current_retry = state.get("retry_count", 0)
         state["retry_count"] = current_retry + 1
         
-        print("\n" + "="*80)
-        print(f"🔄 NODE: CONTENT REGENERATION - Attempt {state['retry_count']}")
-        print("="*80)
+        self._print_banner(f"🔄 NODE: CONTENT REGENERATION - Attempt {state['retry_count']}")
         
         # Show which platforms failed
-        failed_platforms = []
-        if not state["twitter_quality"].get("approved", False):
-            failed_platforms.append("Twitter")
-        if not state["linkedin_quality"].get("approved", False):
-            failed_platforms.append("LinkedIn")
-        if not state["instagram_quality"].get("approved", False):
-            failed_platforms.append("Instagram")
-        if not state["newsletter_quality"].get("approved", False):
-            failed_platforms.append("Newsletter")
+        failed = [
+            platform for platform in PLATFORMS
+            if not state[f"{platform}_quality"].get("approved", False)
+        ]
         
-        print(f"Failed platforms: {', '.join(failed_platforms)}")
+        print(f"Failed platforms: {', '.join(PLATFORM_LABELS[platform] for platform in failed)}")
         print(f"Regenerating only failed content...\n")
-        
-        # Only regenerate platforms that failed
-        if not state["twitter_quality"].get("approved", False):
-            print("  🐦 Regenerating Twitter...")
-            feedback = state["twitter_quality"].get("feedback", "")
-            twitter_result = self.twitter_agent.generate(
-                research_report=state["research_report"],
-                strategy=state["strategy"],
-                brand_info=state["brand_info"],
-                topic=state["topic"],
-                brand_tone=state["brand_tone"],
-                feedback=feedback
-            )
-            state["twitter_content"] = twitter_result["content"]
-        
-        if not state["linkedin_quality"].get("approved", False):
-            print("  💼 Regenerating LinkedIn...")
-            feedback = state["linkedin_quality"].get("feedback", "")
-            linkedin_result = self.linkedin_agent.generate(
-                research_report=state["research_report"],
-                strategy=state["strategy"],
-                brand_info=state["brand_info"],
-                topic=state["topic"],
-                brand_tone=state["brand_tone"],
-                feedback=feedback
-            )
-            state["linkedin_content"] = linkedin_result["content"]
-        
-        if not state["instagram_quality"].get("approved", False):
-            print("  📸 Regenerating Instagram...")
-            feedback = state["instagram_quality"].get("feedback", "")
-            instagram_result = self.instagram_agent.generate(
-                research_report=state["research_report"],
-                strategy=state["strategy"],
-                brand_info=state["brand_info"],
-                topic=state["topic"],
-                brand_tone=state["brand_tone"],
-                feedback=feedback
-            )
-            state["instagram_content"] = instagram_result["content"]
-        
-        if not state["newsletter_quality"].get("approved", False):
-            print("  📧 Regenerating Newsletter...")
-            feedback = state["newsletter_quality"].get("feedback", "")
-            newsletter_result = self.newsletter_agent.generate(
-                research_report=state["research_report"],
-                strategy=state["strategy"],
-                brand_info=state["brand_info"],
-                topic=state["topic"],
-                brand_tone=state["brand_tone"],
-                feedback=feedback
-            )
-            state["newsletter_content"] = newsletter_result["content"]
+        return failed
+
+    def _apply_regeneration(self, state: ContentCreationState, failed: list, contents: list) -> ContentCreationState:
+        for platform, content in zip(failed, contents):
+            state[f"{platform}_content"] = content
         
         print("✅ Failed content regenerated")
         return state
@@ -349,17 +609,15 @@ class ContentCreationOrchestrator:
             print(f"\n🔄 Quality check failed. Retrying... (Attempt {retry_count + 1})")
             return "retry"
 
-    def run(self, brand_info: str, industry: str, target_audience: str, 
-            topic: str, brand_tone: str) -> ContentCreationState:
-        """
-        Execute the complete workflow
-        """
+    def _print_banner(self, title: str):
         print("\n" + "="*80)
-        print("🚀 LANGGRAPH ORCHESTRATED WORKFLOW - STARTING")
+        print(title)
         print("="*80)
-        
-        # Initialize state
-        initial_state = ContentCreationState(
+
+    def _initial_state(self, brand_info: str, industry: str, target_audience: str,
+                       topic: str, brand_tone: str) -> ContentCreationState:
+        return ContentCreationState(
+            run_id="",
             brand_info=brand_info,
             industry=industry,
             target_audience=target_audience,
@@ -380,25 +638,179 @@ class ContentCreationOrchestrator:
             retry_count=0,
             twitter_attempts=[], linkedin_attempts=[],
             instagram_attempts=[], newsletter_attempts=[],
+            twitter_candidates=[], linkedin_candidates=[],
+            instagram_candidates=[], newsletter_candidates=[],
+            timings={},
         )
-        
-        # Run the workflow
-        final_state = self.workflow.invoke(initial_state)
-        
-        print("\n" + "="*80)
-        print("🎉 WORKFLOW COMPLETED")
-        print("="*80)
+
+    def _finalize(self, final_state: ContentCreationState) -> ContentCreationState:
+        """Replace each platform's content with its best attempt, approved ones first"""
+        self._print_banner("🎉 WORKFLOW COMPLETED")
         
         def choose_best(attempts):
             if not attempts:
                 return ""
-            # Each attempt is {"content": ..., "score": ...}
-            best = max(attempts, key=lambda x: x["score"])
+            # Each attempt is {"content": ..., "score": ..., "approved": ...}
+            best = max(attempts, key=lambda x: (x.get("approved", False), x["score"]))
             return best["content"]
 
-        final_state["twitter_content"] = choose_best(final_state["twitter_attempts"])
-        final_state["linkedin_content"] = choose_best(final_state["linkedin_attempts"])
-        final_state["instagram_content"] = choose_best(final_state["instagram_attempts"])
-        final_state["newsletter_content"] = choose_best(final_state["newsletter_attempts"])
+        for platform in PLATFORMS:
+            final_state[f"{platform}_content"] = choose_best(final_state[f"{platform}_attempts"])
 
         return final_state
+
+    def _prepare_run(self, brand_info: str, industry: str, target_audience: str,
+                     topic: str, brand_tone: str, resume_id: Optional[str]):
+        """
+        Return (graph input, config) for a run. A new run gets a fresh thread id;
+        a resumed run reuses `resume_id` and starts from its last checkpoint.
+        """
+        if resume_id and not self.checkpointer:
+            raise ValueError("resume_id requires checkpointing (checkpoint_path is None or "
+                             "langgraph-checkpoint-sqlite is not installed)")
+        
+        run_id = resume_id or uuid.uuid4().hex
+        config = {"configurable": {"thread_id": run_id}}
+        if self.profile_dir:
+            # Only one cProfile can be active at a time, so run the fan-out
+            # sequentially rather than leave all but one branch unprofiled
+            config["max_concurrency"] = 1
+        print(f"🧵 Run ID: {run_id}")
+        
+        initial_state = self._initial_state(brand_info, industry, target_audience, topic, brand_tone)
+        initial_state["run_id"] = run_id
+        return initial_state, config
+
+    def _discard_checkpoints(self, config) -> None:
+        """Drop a completed run's checkpoints so the database doesn't keep every run"""
+        if self.checkpointer is not None and not self.keep_completed_checkpoints:
+            self.checkpointer.delete_thread(config["configurable"]["thread_id"])
+
+    async def _adiscard_checkpoints(self, config) -> None:
+        if self.checkpointer is not None and not self.keep_completed_checkpoints:
+            await self.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+
+    def _resume_input(self, snapshot, initial_state: ContentCreationState):
+        """
+        Graph input for a resumed run: None continues from the checkpoint;
+        with no checkpoint for this id the run starts from scratch.
+        """
+        if not snapshot.values:
+            print("No checkpoint found for this run, starting from scratch")
+            return initial_state
+        print(f"♻️  Resuming from checkpoint before: {', '.join(snapshot.next)}")
+        return None
+
+    def run(self, brand_info: str, industry: str, target_audience: str, 
+            topic: str, brand_tone: str, resume_id: Optional[str] = None) -> ContentCreationState:
+        """
+        Execute the complete workflow. Pass the run_id of a failed run as
+        `resume_id` to continue from its last completed node.
+        """
+        self._print_banner("🚀 LANGGRAPH ORCHESTRATED WORKFLOW - STARTING")
+        
+        # Initialize state
+        initial_state, config = self._prepare_run(
+            brand_info, industry, target_audience, topic, brand_tone, resume_id
+        )
+        graph_input = initial_state
+        if resume_id:
+            snapshot = self.workflow.get_state(config)
+            if snapshot.values and not snapshot.next:
+                # Run already finished, nothing left to do
+                self._discard_checkpoints(config)
+                return self._finalize(snapshot.values)
+            graph_input = self._resume_input(snapshot, initial_state)
+        
+        # Run the workflow
+        with self._driving():
+            final_state = self.workflow.invoke(graph_input, config)
+        self._discard_checkpoints(config)
+        return self._finalize(final_state)
+
+    async def arun(self, brand_info: str, industry: str, target_audience: str,
+                   topic: str, brand_tone: str, resume_id: Optional[str] = None) -> ContentCreationState:
+        """
+        Execute the complete workflow on the running event loop. Every LLM
+        call goes through ainvoke, so many campaigns can share one loop.
+        """
+        self._print_banner("🚀 LANGGRAPH ORCHESTRATED WORKFLOW - STARTING")
+        
+        initial_state, config = self._prepare_run(
+            brand_info, industry, target_audience, topic, brand_tone, resume_id
+        )
+        graph_input = initial_state
+        if resume_id:
+            snapshot = await self.workflow.aget_state(config)
+            if snapshot.values and not snapshot.next:
+                await self._adiscard_checkpoints(config)
+                return self._finalize(snapshot.values)
+            graph_input = self._resume_input(snapshot, initial_state)
+        
+        with self._driving():
+            final_state = await self.workflow.ainvoke(graph_input, config)
+        await self._adiscard_checkpoints(config)
+        return self._finalize(final_state)
+
+    def stream(self, brand_info: str, industry: str, target_audience: str,
+               topic: str, brand_tone: str, resume_id: Optional[str] = None) -> Iterator[StreamEvent]:
+        """
+        Run the workflow and yield events as they happen: NodeStarted /
+        NodeFinished for every node, TokenChunk for each piece of platform
+        content, and finally RunCompleted with the same state run() returns.
+        """
+        events = queue.Queue()
+        done = object()
+        outcome = {}
+
+        def produce():
+            try:
+                with event_sink(events.put):
+                    outcome["state"] = self.run(
+                        brand_info, industry, target_audience, topic, brand_tone, resume_id
+                    )
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                events.put(done)
+
+        worker = threading.Thread(target=produce, name="content-stream", daemon=True)
+        worker.start()
+        while (event := events.get()) is not done:
+            yield event
+        worker.join()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        yield RunCompleted(state=outcome["state"])
+
+    async def astream(self, brand_info: str, industry: str, target_audience: str,
+                      topic: str, brand_tone: str, resume_id: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+        """
+        Async counterpart of stream(), driven by arun() on the running loop
+        """
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        done = object()
+
+        def put(event):
+            # Events can come from worker threads (e.g. searches), so hop to the loop
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        async def produce():
+            try:
+                with event_sink(put):
+                    return await self.arun(
+                        brand_info, industry, target_audience, topic, brand_tone, resume_id
+                    )
+            finally:
+                put(done)
+
+        task = asyncio.create_task(produce())
+        try:
+            while (event := await events.get()) is not done:
+                yield event
+            yield RunCompleted(state=await task)
+        finally:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,249 @@
+"""
+HTTP service around ContentCreationOrchestrator.
+
+One long-lived process keeps a single orchestrator (warm LLM clients and a
+compiled graph) and serves campaigns from an in-process job queue with a
+configurable worker pool.
+
+Run with:
+    uvicorn src.service:app --port 8000
+or:
+    python -m src.service
+
+Endpoints:
+    POST /campaigns              submit a brief, returns {"job_id": ...}
+    GET  /jobs/{job_id}          job status
+    GET  /jobs/{job_id}/result   final state once the job has completed
+    GET  /jobs/{job_id}/events   server-sent events: node progress (replayed) and live tokens
+"""
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.orchestrator import ContentCreationOrchestrator
+from src.utils.env import getenv
+from src.utils.streaming import RunCompleted, TokenChunk
+
+
+class CampaignBrief(BaseModel):
+    brand_info: str
+    industry: str
+    target_audience: str
+    topic: str
+    brand_tone: str = "Professional but approachable"
+    resume_id: Optional[str] = None
+
+
+class Job:
+    """A submitted campaign and everything a client can ask about it"""
+
+    def __init__(self, brief: CampaignBrief):
+        self.id = uuid.uuid4().hex
+        self.brief = brief
+        self.status = "queued"
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        # Node and job events, replayed to late subscribers. Token events
+        # only go to the streams connected when they happen, so a finished
+        # job doesn't keep every chunk of its content around.
+        self.events: List[dict] = []
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def add_event(self, event: dict, replay: bool = True):
+        if replay:
+            self.events.append(event)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(event)
+
+    async def follow(self) -> AsyncIterator[dict]:
+        """Events so far, then live ones until the job is done"""
+        # Replay and subscribe without yielding to the loop in between,
+        # so no event is missed or seen twice
+        live: asyncio.Queue = asyncio.Queue()
+        past = list(self.events)
+        if not self.done:
+            self._subscribers.append(live)
+        try:
+            for event in past:
+                yield event
+            while not (self.done and live.empty()):
+                yield await live.get()
+        finally:
+            if live in self._subscribers:
+                self._subscribers.remove(live)
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "run_id": (self.result or {}).get("run_id"),
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue served by `workers` coroutines that share one
+    orchestrator. Finished jobs beyond `max_jobs` are forgotten, oldest first.
+    """
+
+    def __init__(self, orchestrator: ContentCreationOrchestrator,
+                 workers: int = 4, max_jobs: int = 1000):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"campaign-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, brief: CampaignBrief) -> Job:
+        job = Job(brief)
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._forget_old_jobs()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    def _forget_old_jobs(self):
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job.id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.started = time.time()
+        job.add_event({"type": "job_started", "job_id": job.id})
+        brief = job.brief
+        try:
+            async for event in self.orchestrator.astream(
+                brand_info=brief.brand_info,
+                industry=brief.industry,
+                target_audience=brief.target_audience,
+                topic=brief.topic,
+                brand_tone=brief.brand_tone,
+                resume_id=brief.resume_id,
+            ):
+                if isinstance(event, RunCompleted):
+                    job.result = event.state
+                else:
+                    job.add_event(event.to_dict(), replay=not isinstance(event, TokenChunk))
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        job.finished = time.time()
+        job.add_event({"type": f"job_{job.status}", "job_id": job.id, "error": job.error})
+
+
+def create_app(orchestrator: Optional[ContentCreationOrchestrator] = None,
+               workers: Optional[int] = None) -> FastAPI:
+    """
+    Build the FastAPI app. The orchestrator is created once at startup and
+    shared by every worker; SERVICE_WORKERS sets the pool size.
+    """
+    workers = workers or int(getenv("SERVICE_WORKERS", "4"))
+    max_jobs = int(getenv("SERVICE_MAX_JOBS", "1000"))
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.jobs = JobQueue(orchestrator or ContentCreationOrchestrator(), workers, max_jobs)
+        app.state.jobs.start()
+        yield
+        await app.state.jobs.stop()
+
+    app = FastAPI(title="AI Content Repurposer", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        jobs: JobQueue = app.state.jobs
+        return {
+            "status": "ok",
+            "workers": jobs.workers,
+            "queued": jobs._queue.qsize(),
+            "jobs": len(jobs.jobs),
+        }
+
+    @app.post("/campaigns", status_code=202)
+    async def submit_campaign(brief: CampaignBrief):
+        job = app.state.jobs.submit(brief)
+        return {"job_id": job.id, "status": job.status}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return app.state.jobs.get(job_id).summary()
+
+    @app.get("/jobs/{job_id}/result")
+    async def job_result(job_id: str):
+        job = app.state.jobs.get(job_id)
+        if job.status == "failed":
+            raise HTTPException(status_code=500, detail=job.error)
+        if job.status != "completed":
+            raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+        return job.result
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str):
+        job = app.state.jobs.get(job_id)
+
+        async def event_stream():
+            # Replay node progress so far, then follow the job live
+            async for event in job.follow():
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=getenv("SERVICE_HOST", "127.0.0.1"), port=int(getenv("SERVICE_PORT", "8000")))
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - xxhash is optional
+    xxhash = None
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable parts, used as a cache key"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fast_hash(*parts: str) -> str:
+    """
+    Hash of string parts for hot-path cache keys: xxh3-128 when xxhash is
+    installed, blake2b otherwise
+    """
+    payload = "\x1f".join(parts).encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(payload)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class PersistentCache:
+    """
+    Thread-safe key/value cache kept in memory and, when `path` is given,
+    mirrored to a SQLite file so entries survive across runs. Values must be
+    JSON-serialisable. Several caches can share one file via `namespace`.
+
+    Entries older than `ttl` seconds are treated as missing and dropped.
+    With `max_entries`, the least recently used entries beyond that many are
+    evicted, both in memory and on disk.
+    """
+
+    def __init__(self, path: Optional[str] = None, namespace: str = "default",
+                 ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (value, created), least recently used first
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created REAL NOT NULL DEFAULT 0, accessed REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            # Files written before eviction existed lack the timestamp columns
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+            for column in ("created", "accessed"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE cache ADD COLUMN {column} REAL NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed)")
+            self._conn.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, value: Any, created: float):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                value, created = self._memory[key]
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self._touch(key, now)
+                    self.hits += 1
+                    return value
+                self._drop(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        value = json.loads(row[0])
+                        self._remember(key, value, row[1])
+                        self._touch(key, now)
+                        self.hits += 1
+                        return value
+                    self._drop(key)
+            self.misses += 1
+            return None
+
+    def contains(self, key: str) -> bool:
+        """Whether get(key) would hit, without counting or touching the entry"""
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                return not self._expired(self._memory[key][1], now)
+            if self._conn is None:
+                return False
+            row = self._conn.execute(
+                "SELECT created FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            return row is not None and not self._expired(row[0], now)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                self._evict(now)
+                self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                self._conn.commit()
+
+    def _touch(self, key: str, now: float):
+        if self._conn is not None and self.max_entries is not None:
+            self._conn.execute(
+                "UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self._conn.commit()
+
+    def _drop(self, key: str):
+        self._memory.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+        self.evictions += 1
+
+    def _evict(self, now: float):
+        """Drop expired rows, then the least recently used beyond max_entries"""
+        evicted = 0
+        if self.ttl is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND created < ?",
+                (self.namespace, now - self.ttl)
+            ).rowcount
+        if self.max_entries is not None:
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+            if count > self.max_entries:
+                evicted += self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache WHERE namespace = ? ORDER BY accessed LIMIT ?)",
+                    (self.namespace, self.namespace, count - self.max_entries)
+                ).rowcount
+        self.evictions += evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries_in_memory": len(self._memory),
+            }
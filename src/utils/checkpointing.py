@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sqlite3
+from typing import Any, AsyncIterator, Optional, Sequence
+from src.utils.env import getenv
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # langgraph-checkpoint-sqlite is a separate package from langgraph
+    SqliteSaver = None
+
+
+def default_checkpoint_path() -> Optional[str]:
+    """
+    SQLite file used for workflow checkpoints. Set CHECKPOINT_DB to change it,
+    or to an empty string to turn checkpointing off.
+    """
+    return getenv("CHECKPOINT_DB", "checkpoints.sqlite") or None
+
+
+def open_checkpointer(path: str) -> Optional["ThreadedSqliteSaver"]:
+    """
+    Checkpointer writing to the SQLite file at `path`, or None (with a
+    warning) when langgraph-checkpoint-sqlite isn't installed, so runs go
+    ahead without checkpoints instead of failing
+    """
+    if SqliteSaver is None:
+        print("⚠️  Checkpointing disabled: pip install langgraph-checkpoint-sqlite to enable it")
+        return None
+    return ThreadedSqliteSaver.from_path(path)
+
+
+# Defined without the package too so this module imports; open_checkpointer()
+# only instantiates it when SqliteSaver is there
+class ThreadedSqliteSaver(SqliteSaver or object):
+    """
+    SqliteSaver whose async interface runs the sync methods in a worker
+    thread, so one checkpointer (and one connection) serves both invoke()
+    and ainvoke(). SqliteSaver already serialises access with its own lock.
+    """
+
+    @classmethod
+    def from_path(cls, path: str) -> "ThreadedSqliteSaver":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return cls(sqlite3.connect(path, check_same_thread=False))
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.env import getenv
+
+
+def default_provider_limits() -> Dict[str, int]:
+    """
+    Max concurrent LLM calls per provider, overridable from the environment
+    """
+    return {
+        "groq": int(getenv("GROQ_MAX_CONCURRENCY", "4")),
+        "ollama": int(getenv("OLLAMA_MAX_CONCURRENCY", "2")),
+    }
+
+
+class ProviderLimiter:
+    """
+    Caps how many LLM calls run at once against each provider
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {**default_provider_limits(), **(limits or {})}
+        self._semaphores = {
+            provider: threading.BoundedSemaphore(max(1, limit))
+            for provider, limit in self.limits.items()
+        }
+        # asyncio semaphores are bound to the loop that first uses them
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = threading.BoundedSemaphore(1)
+            return self._semaphores[provider]
+
+    @contextmanager
+    def slot(self, provider: str):
+        """Hold one concurrency slot for `provider` while the block runs"""
+        semaphore = self._semaphore(provider)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def _async_semaphore(self, provider: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._async_semaphores.setdefault(loop, {})
+            if provider not in semaphores:
+                semaphores[provider] = asyncio.Semaphore(max(1, self.limits.get(provider, 1)))
+            return semaphores[provider]
+
+    @asynccontextmanager
+    async def aslot(self, provider: str):
+        """Async counterpart of slot() for coroutines on the running loop"""
+        async with self._async_semaphore(provider):
+            yield
+
+
+def map_concurrently(fn: Callable, items: Iterable, max_workers: Optional[int] = None) -> List:
+    """
+    Run fn over items in a thread pool and return results in input order.
+
+    Each call runs in a copy of the caller's context so context variables
+    (LangChain callbacks, run-scoped settings) follow the work into the pool.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if len(items) == 1:
+        return [fn(items[0])]
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(items)) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, fn, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,132 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence
+from src.utils.env import getenv
+
+# Lines that start a new section in LLM-written reports and strategies:
+# markdown headings, bold titles, numbered items and "ALL CAPS:" labels
+_SECTION_START = re.compile(
+    r"^\s*(?:#{1,6}\s+\S|\*\*[^*\n]+\*\*|\d+[.)]\s+\S|[A-Z][A-Z0-9 &/()\-]{3,}:)"
+)
+
+# Sections that don't fully fit are cut; below this many tokens it isn't worth it
+_MIN_PARTIAL_TOKENS = 48
+_TRIMMED_MARKER = "\n[...]\n"
+
+
+def budget_scale() -> float:
+    """
+    Multiplier applied to every agent's token budgets. CONTEXT_BUDGET_SCALE=2
+    doubles them; 0 turns budgeting off and sends the full context.
+    """
+    return float(getenv("CONTEXT_BUDGET_SCALE", "1.0"))
+
+
+class TokenCounter:
+    """
+    tiktoken-based token counter. cl100k_base is not Llama's tokenizer, but it
+    is close enough for budgeting. If the encoding can't be loaded (e.g. no
+    network to fetch it), falls back to ~4 characters per token.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+
+    @property
+    def encoding(self):
+        if not self._loaded:
+            self._loaded = True
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                print(f"tiktoken unavailable ({e}), estimating tokens from length")
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return (len(text) + 3) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens, preferring to end on a line or sentence"""
+        if self.encoding is None:
+            cut = text[:max_tokens * 4]
+        else:
+            cut = self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+        boundary = max(cut.rfind("\n"), cut.rfind(". "))
+        if boundary > len(cut) // 2:
+            cut = cut[:boundary + 1]
+        return cut
+
+
+token_counter = TokenCounter()
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text at heading-like lines; joining the result gives back the text"""
+    sections, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and _SECTION_START.match(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def _section_score(section: str, priorities: Sequence[str]) -> int:
+    """Earlier priority keywords weigh more; a keyword in the heading line counts double"""
+    heading, _, body = section.lower().partition("\n")
+    score = 0
+    for rank, keyword in enumerate(priorities):
+        # Match at a word start so "cta" doesn't hit "expectation"
+        pattern = r"\b" + re.escape(keyword)
+        weight = len(priorities) - rank
+        if re.search(pattern, heading):
+            score += 2 * weight
+        elif re.search(pattern, body):
+            score += weight
+    return score
+
+
+@lru_cache(maxsize=256)
+def _fit(text: str, max_tokens: int, priorities: tuple) -> str:
+    if token_counter.count(text) <= max_tokens:
+        return text
+
+    sections = split_sections(text)
+    # Highest priority first; ties keep document order
+    order = sorted(range(len(sections)), key=lambda i: (-_section_score(sections[i], priorities), i))
+
+    kept = {}
+    remaining = max_tokens
+    for i in order:
+        tokens = token_counter.count(sections[i])
+        if tokens <= remaining:
+            kept[i] = sections[i]
+            remaining -= tokens
+        elif remaining >= _MIN_PARTIAL_TOKENS:
+            kept[i] = token_counter.truncate(sections[i], remaining) + _TRIMMED_MARKER
+            remaining = 0
+        if remaining < _MIN_PARTIAL_TOKENS:
+            break
+
+    return "".join(kept[i] for i in sorted(kept)).strip()
+
+
+def fit_to_budget(text: str, max_tokens: Optional[int], priorities: Sequence[str] = ()) -> str:
+    """
+    Fit `text` into `max_tokens` (scaled by CONTEXT_BUDGET_SCALE). Sections
+    mentioning the priority keywords (e.g. "hook", "statistic", "cta") are
+    kept first; the rest fill what budget is left, are trimmed or dropped.
+    Kept sections stay in their original order. Text within budget, or a
+    None budget, is returned unchanged.
+    """
+    scale = budget_scale()
+    if not text or not max_tokens or scale <= 0:
+        return text
+    return _fit(text, int(max_tokens * scale), tuple(keyword.lower() for keyword in priorities))
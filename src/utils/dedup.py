@@ -0,0 +1,108 @@
+import re
+from typing import Dict, Iterable, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.utils.cache import fast_hash
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "si"}
+
+# Shingle width, and the fewest words a text needs for near-duplicate matching
+SHINGLE_WORDS = 3
+MIN_NEAR_DUPLICATE_WORDS = 12
+
+# Fewest shingles two texts must share to be near duplicates by overlap, so
+# one quoted sentence in common doesn't make two short snippets the same
+MIN_SHARED_SHINGLES = 8
+
+
+def canonical_url(url: str) -> str:
+    """
+    URL reduced to what identifies the page: lower-case host without
+    "www.", no scheme difference, fragment, tracking parameters (utm_*,
+    gclid, ...) or trailing slash, and the remaining query sorted
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def shingles(text: str) -> Set[str]:
+    """Overlapping SHINGLE_WORDS-word sequences of a text, case and punctuation ignored"""
+    words = _WORD.findall(text.lower())
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+
+
+def simhash(features: Iterable[str], bits: int = 64) -> int:
+    """
+    SimHash fingerprint of a set of features (e.g. shingles): feature sets
+    that mostly agree get fingerprints a few bits apart
+    """
+    weights = [0] * bits
+    for feature in features:
+        digest = int(fast_hash(feature)[:bits // 4], 16)
+        for bit in range(bits):
+            weights[bit] += 1 if (digest >> bit) & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class _Text:
+    """Shingles and fingerprint of one result's content"""
+
+    def __init__(self, content: str):
+        self.normalised = " ".join(_WORD.findall(content.lower()))
+        long_enough = len(self.normalised.split()) >= MIN_NEAR_DUPLICATE_WORDS
+        self.shingles = shingles(content) if long_enough else set()
+        self.fingerprint = simhash(self.shingles) if long_enough else None
+
+    def near_duplicate(self, other: "_Text", max_distance: int, min_overlap: float) -> bool:
+        if self.fingerprint is None or other.fingerprint is None:
+            return False
+        if bin(self.fingerprint ^ other.fingerprint).count("1") <= max_distance:
+            return True
+        # Snippets of one page differ in length and cut-off, so compare shared
+        # shingles against the shorter text rather than the union; the high
+        # bar and minimum count keep pages that only quote the same sentence
+        shared = len(self.shingles & other.shingles)
+        return shared >= MIN_SHARED_SHINGLES and \
+            shared / min(len(self.shingles), len(other.shingles)) >= min_overlap
+
+
+def dedupe_results(results: List[Dict], max_distance: int = 3, min_overlap: float = 0.8) -> List[Dict]:
+    """
+    Search results with duplicates removed, first occurrence kept and order
+    preserved. Two results are duplicates when their URLs are the same
+    after canonical_url(), or their content is the same ignoring case and
+    punctuation, or (for texts of MIN_NEAR_DUPLICATE_WORDS words or more)
+    their shingle SimHashes differ in at most `max_distance` bits or at
+    least `min_overlap` of the shorter text's shingles, and no fewer than
+    MIN_SHARED_SHINGLES, appear in the other.
+    """
+    kept: List[Dict] = []
+    seen_urls = set()
+    texts: List[_Text] = []
+    for result in results:
+        url = canonical_url(result.get("url", ""))
+        text = _Text(result.get("content", ""))
+        if (url and url in seen_urls) or any(
+            (text.normalised and text.normalised == other.normalised)
+            or text.near_duplicate(other, max_distance, min_overlap)
+            for other in texts
+        ):
+            continue
+        kept.append(result)
+        if url:
+            seen_urls.add(url)
+        texts.append(text)
+    return kept
@@ -0,0 +1,16 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load .env into the process environment, once, on first use"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def getenv(key: str, default: Optional[str] = None) -> Optional[str]:
+    """os.getenv that makes sure .env has been loaded first"""
+    load_env()
+    return os.getenv(key, default)
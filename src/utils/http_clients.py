@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """
+    httpx.AsyncClient that can be shared by every event loop in the process.
+    An AsyncClient's pooled connections belong to the loop that opened them,
+    so reusing one after that loop closes (e.g. a second asyncio.run) fails
+    with "Event loop is closed". Requests are built here and sent through a
+    client of the running loop's own, created with the same settings on
+    first use and dropped with the loop.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._client_kwargs = kwargs
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._loop_lock = threading.Lock()
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._loop_clients[loop] = httpx.AsyncClient(**self._client_kwargs)
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._loop_client().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the running loop's client; other loops' go with their loops"""
+        with self._loop_lock:
+            client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,176 @@
+import contextvars
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from src.utils.env import getenv
+
+# Collector for the node currently running. Context variables follow the work
+# into LangGraph's executor, map_concurrently and asyncio.to_thread, so agent
+# and search calls made on behalf of a node land in that node's collector.
+_current_collector = contextvars.ContextVar("metrics_collector", default=None)
+
+# Sections of the `timings` dict. Duration sections hold lists of seconds
+# ("queue" is time spent waiting for rate-limit budget, by model), "retries"
+# holds integer counters.
+DURATION_SECTIONS = ("nodes", "llm", "search", "queue")
+
+# Held by the node being profiled. Only one cProfile can be active at a time
+# (per process on Python 3.12+, per thread before). The orchestrator runs
+# nodes one at a time when profiling; anything that still overlaps (another
+# orchestrator, a nested block) runs unprofiled.
+_profile_lock = threading.Lock()
+
+
+class MetricsCollector:
+    """
+    Thread-safe bucket of durations and retry counters for one node run
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, dict] = {}
+
+    def add_duration(self, section: str, name: str, seconds: float):
+        with self._lock:
+            self.timings.setdefault(section, {}).setdefault(name, []).append(seconds)
+
+    def add_retries(self, name: str, count: int = 1):
+        with self._lock:
+            retries = self.timings.setdefault("retries", {})
+            retries[name] = retries.get(name, 0) + count
+
+
+def record_duration(section: str, name: str, seconds: float):
+    """Record a duration against the active node, if any"""
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.add_duration(section, name, seconds)
+
+
+def record_retry(name: str, count: int = 1):
+    """Count a retry against the active node, if any"""
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.add_retries(name, count)
+
+
+@contextmanager
+def track(section: str, name: str):
+    """Time the enclosed block, e.g. `with track("llm", "QualityAgent"):`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(section, name, time.perf_counter() - started)
+
+
+@contextmanager
+def collecting():
+    """Install a fresh MetricsCollector for the enclosed block"""
+    collector = MetricsCollector()
+    token = _current_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_collector.reset(token)
+
+
+@contextmanager
+def profiled(path: Optional[str]):
+    """
+    Run the enclosed block under cProfile and dump stats to `path`.
+    No-op when path is None. cProfile only sees the calling thread, so work a
+    node hands to a thread pool shows up as time spent waiting on futures,
+    and a coroutine's profile includes whatever else ran on the event loop
+    while it awaited. Only one block is profiled at a time: if another one
+    (or any other profiling tool) is active, the block runs unprofiled and
+    nothing is written.
+    """
+    if path is None:
+        yield
+        return
+    if not _profile_lock.acquire(blocking=False):
+        print(f"⏭️  Another node is being profiled, {os.path.basename(path)} not written")
+        yield
+        return
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as error:
+            # e.g. "Another profiling tool is already active"
+            print(f"⏭️  Not profiling {os.path.basename(path)}: {error}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            profiler.dump_stats(path)
+    finally:
+        _profile_lock.release()
+
+
+def default_profile_dir() -> Optional[str]:
+    """Per-node cProfile dumps are written here when PROFILE_DIR is set"""
+    return getenv("PROFILE_DIR") or None
+
+
+def merge_timings(left: dict, right: dict) -> dict:
+    """
+    Reducer for the `timings` state key: duration lists are appended (nodes
+    run more than once on retries) and retry counters are summed.
+    """
+    merged = {
+        section: {name: list(v) if isinstance(v, list) else v for name, v in values.items()}
+        for section, values in (left or {}).items()
+    }
+    for section, values in (right or {}).items():
+        target = merged.setdefault(section, {})
+        for name, value in values.items():
+            if isinstance(value, list):
+                target.setdefault(name, []).extend(value)
+            else:
+                target[name] = target.get(name, 0) + value
+    return merged
+
+
+def summarize_timings(timings: dict) -> dict:
+    """Collapse duration lists to {count, total, mean} for reporting"""
+    summary = {}
+    for section in DURATION_SECTIONS:
+        summary[section] = {
+            name: {
+                "count": len(durations),
+                "total": round(sum(durations), 2),
+                "mean": round(sum(durations) / len(durations), 2),
+            }
+            for name, durations in sorted(timings.get(section, {}).items())
+            if durations
+        }
+    summary["retries"] = dict(timings.get("retries", {}))
+    return summary
+
+
+def format_timings(timings: dict) -> List[str]:
+    """Human-readable lines for printing a run's timings"""
+    summary = summarize_timings(timings)
+    titles = {"nodes": "Nodes", "llm": "LLM calls", "search": "Searches", "queue": "Rate-limit waits"}
+    lines = []
+    for section in DURATION_SECTIONS:
+        if not summary[section]:
+            continue
+        lines.append(f"  {titles[section]}:")
+        for name, stats in summary[section].items():
+            lines.append(f"    {name:<26} {stats['total']:>8.2f}s total  "
+                         f"{stats['mean']:>7.2f}s mean  x{stats['count']}")
+    if summary["retries"]:
+        lines.append("  Retries:")
+        for name, count in sorted(summary["retries"].items()):
+            lines.append(f"    {name:<26} {count}")
+    return lines
@@ -0,0 +1,114 @@
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from langchain_core.prompt_values import PromptValue
+
+from src.utils.cache import PersistentCache, fast_hash
+from src.utils.env import getenv
+
+
+def default_llm_cache_path() -> Optional[str]:
+    """
+    SQLite file for cached LLM responses. Set LLM_CACHE_PATH to change it,
+    or to an empty string to turn the response cache off.
+    """
+    return getenv("LLM_CACHE_PATH", "llm_cache.sqlite") or None
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache backed by a PersistentCache. Keys hash the model,
+    temperature, LangChain's string of the LLM's other settings and the
+    rendered prompt, so changing any of them is a miss. Model and
+    temperature are bound with for_llm() because not every LLM class
+    (e.g. OllamaLLM) includes them in that settings string.
+    """
+
+    def __init__(self, store: PersistentCache, model: str = "", temperature: Optional[float] = None):
+        self.store = store
+        self.model = model
+        self.temperature = temperature
+
+    def for_llm(self, model: str, temperature: Optional[float]) -> "LLMResponseCache":
+        """A view of the same store for one model and temperature"""
+        return LLMResponseCache(self.store, model, temperature)
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return fast_hash(self.model, repr(self.temperature), llm_string, prompt)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        entry = self.store.get(self._key(prompt, llm_string))
+        if entry is None:
+            return None
+        return [_generation_from_dict(generation) for generation in entry]
+
+    def contains(self, prompt: str, llm_string: str) -> bool:
+        """Whether lookup() would hit, without counting a hit or miss"""
+        return self.store.contains(self._key(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]):
+        self.store.set(self._key(prompt, llm_string), [_generation_to_dict(g) for g in return_val])
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+def has_cached_response(llm, prompt: PromptValue) -> bool:
+    """
+    Whether invoking `llm` on `prompt` would be answered by its
+    LLMResponseCache, keyed the way LangChain keys the lookup it makes
+    inside the call. Streaming bypasses the cache and isn't covered.
+    """
+    cache = getattr(llm, "cache", None)
+    if not isinstance(cache, LLMResponseCache):
+        return False
+    if isinstance(llm, BaseChatModel):
+        messages = [
+            message.model_copy(update={"id": None}) if getattr(message, "id", None) is not None else message
+            for message in prompt.to_messages()
+        ]
+        return cache.contains(dumps(messages), llm._get_llm_string(stop=None))
+    params = llm._dict_for_compat() if hasattr(llm, "_dict_for_compat") else llm.dict()
+    params["stop"] = None
+    return cache.contains(prompt.to_string(), str(sorted(params.items())))
+
+
+def _generation_to_dict(generation: Generation) -> dict:
+    if isinstance(generation, ChatGeneration):
+        return {"message": message_to_dict(generation.message)}
+    return {"text": generation.text, "generation_info": generation.generation_info}
+
+
+def _generation_from_dict(data: dict) -> Generation:
+    if "message" in data:
+        return ChatGeneration(message=messages_from_dict([data["message"]])[0])
+    return Generation(text=data["text"], generation_info=data.get("generation_info"))
+
+
+@lru_cache(maxsize=None)
+def llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    The process-wide response cache, or None when LLM_CACHE_PATH is empty.
+    LLM_CACHE_TTL (seconds, default a week) and LLM_CACHE_MAX_ENTRIES
+    (default 10000) bound how long and how many responses are kept.
+    """
+    path = default_llm_cache_path()
+    if not path:
+        return None
+    ttl = float(getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    max_entries = int(getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    return LLMResponseCache(PersistentCache(path, namespace="llm", ttl=ttl or None, max_entries=max_entries or None))
+
+
+def llm_cache_stats() -> dict:
+    """Hit/miss counts of the response cache in this process"""
+    cache = llm_response_cache()
+    return cache.stats() if cache is not None else {}
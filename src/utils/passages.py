@@ -0,0 +1,133 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from src.utils.context_budget import budget_scale, token_counter
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Words that match everywhere and say nothing about relevance
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "with", "you", "your",
+}
+
+# Passage length in words; sentences are kept whole
+PASSAGE_WORDS = 80
+
+# A passage that doesn't fit is cut to the space left if at least this many tokens
+_MIN_PARTIAL_TOKENS = 48
+
+
+def terms(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def split_passages(text: str, max_words: int = PASSAGE_WORDS) -> List[str]:
+    """Consecutive sentences grouped into passages of up to about `max_words` words"""
+    passages, current, words = [], [], 0
+    for sentence in filter(None, (part.strip() for part in _SENTENCE_END.split(text or ""))):
+        length = len(sentence.split())
+        if current and words + length > max_words:
+            passages.append(" ".join(current))
+            current, words = [], 0
+        current.append(sentence)
+        words += length
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def bm25_scores(query: str, documents: Sequence[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each document for `query`, with IDF from the documents themselves"""
+    query_terms = set(terms(query))
+    tokenised = [terms(document) for document in documents]
+    if not query_terms or not tokenised:
+        return [0.0] * len(documents)
+    average_length = sum(len(document) for document in tokenised) / len(tokenised) or 1.0
+    frequency = Counter(term for document in tokenised for term in set(document) if term in query_terms)
+    idf = {
+        term: math.log(1 + (len(tokenised) - frequency[term] + 0.5) / (frequency[term] + 0.5))
+        for term in query_terms
+    }
+    scores = []
+    for document in tokenised:
+        counts = Counter(document)
+        norm = k1 * (1 - b + b * len(document) / average_length)
+        scores.append(sum(
+            idf[term] * counts[term] * (k1 + 1) / (counts[term] + norm)
+            for term in query_terms if counts[term]
+        ))
+    return scores
+
+
+def _normalised(values: Sequence[float]) -> List[float]:
+    top = max(values, default=0.0)
+    return [value / top if top > 0 else 0.0 for value in values]
+
+
+def rank_passages(results: List[Dict], query: str, provider_weight: float = 0.3) -> List[Dict]:
+    """
+    Every passage of every result's content, best first. Relevance is the
+    passage's BM25 score against `query` blended with its result's provider
+    score (e.g. Tavily's), each scaled to [0, 1], `provider_weight` going
+    to the provider. Results without a provider score (DuckDuckGo's) are
+    ranked on BM25 alone. Each entry is {"source": result index,
+    "position": passage index within it, "text", "score"}; ties keep
+    source order.
+    """
+    passages = [
+        {"source": index, "position": position, "text": text}
+        for index, result in enumerate(results)
+        for position, text in enumerate(split_passages(result.get("content", "")))
+    ]
+    relevance = _normalised(bm25_scores(query, [passage["text"] for passage in passages]))
+    scored = [index for index, result in enumerate(results) if result.get("score") is not None]
+    provider = dict(zip(scored, _normalised([float(results[index]["score"]) for index in scored])))
+    for passage, lexical in zip(passages, relevance):
+        if passage["source"] in provider:
+            passage["score"] = (1 - provider_weight) * lexical + provider_weight * provider[passage["source"]]
+        else:
+            passage["score"] = lexical
+    return sorted(passages, key=lambda passage: -passage["score"])
+
+
+def pack_passages(results: List[Dict], query: str, max_tokens: Optional[int],
+                  header=lambda result: "") -> List[Dict]:
+    """
+    The best-ranked passages that fit in `max_tokens` (scaled by
+    CONTEXT_BUDGET_SCALE), counting each source's `header(result)` once,
+    grouped back by source. Returns [{"result": ..., "content": ...}] with
+    sources ordered by their best passage; content is the source's chosen
+    passages in document order, gaps between them marked " [...] ". A None
+    budget, or a scale of 0, keeps every passage.
+    """
+    scale = budget_scale()
+    budget = int(max_tokens * scale) if max_tokens and scale > 0 else None
+
+    chosen: Dict[int, List[Dict]] = {}
+    remaining = budget
+    for passage in rank_passages(results, query):
+        source = passage["source"]
+        overhead = token_counter.count(header(results[source])) if source not in chosen else 0
+        tokens = token_counter.count(passage["text"])
+        if remaining is not None:
+            if overhead + tokens > remaining:
+                if remaining - overhead < _MIN_PARTIAL_TOKENS:
+                    continue
+                passage = {**passage, "text": token_counter.truncate(passage["text"], remaining - overhead)}
+                tokens = token_counter.count(passage["text"])
+            remaining -= overhead + tokens
+        chosen.setdefault(source, []).append(passage)
+
+    return [{"result": results[source], "content": _join(passages)} for source, passages in chosen.items()]
+
+
+def _join(passages: List[Dict]) -> str:
+    passages = sorted(passages, key=lambda passage: passage["position"])
+    content = passages[0]["text"]
+    for previous, passage in zip(passages, passages[1:]):
+        content += (" " if passage["position"] == previous["position"] + 1 else " [...] ") + passage["text"]
+    return content
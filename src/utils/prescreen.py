@@ -0,0 +1,93 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, List
+
+from src.utils.env import getenv
+
+# Limits the platform prompts in src/agents/enhanced_platform_agents.py ask for
+TWEET_MAX_CHARS = 280
+LINKEDIN_WORDS = (200, 300)
+INSTAGRAM_HASHTAGS = (10, 15)
+
+# "n/N" at the start of a line, as the thread prompt numbers tweets (1/12, 2/12, ...)
+_TWEET_NUMBER = re.compile(r"^[ \t*_#>-]*\(?(\d{1,2})\s*/\s*(\d{1,2})\)?", re.MULTILINE)
+# "Tweet 3:" style labels, for threads numbered without the total
+_TWEET_LABEL = re.compile(r"^[ \t*_#>-]*tweet\s*#?\d{1,2}\s*[:.)-]", re.IGNORECASE | re.MULTILINE)
+_HASHTAG = re.compile(r"#\w+")
+# Any line or markdown heading starting with "subject" ("SUBJECT LINE:", "## Subject", ...)
+_SUBJECT_LINE = re.compile(r"^[ \t>#*_-]*subject\b", re.IGNORECASE | re.MULTILINE)
+
+
+def prescreen_enabled() -> bool:
+    """QUALITY_PRESCREEN=0 sends every draft straight to the LLM evaluator"""
+    return getenv("QUALITY_PRESCREEN", "1") not in ("0", "false", "off", "")
+
+
+def split_tweets(thread: str) -> List[str]:
+    """
+    Tweets of a thread: the text from each "n/N" marker (or, failing those,
+    each "Tweet n:" label) to the next. Anything before the first marker
+    (e.g. "Here's the thread:") is dropped. Only markers with n <= N, N
+    being the total most markers share and no fewer than them, count, so a
+    line opening with "24/7" or "3/4 of teams" isn't taken for a tweet.
+    An unnumbered thread is split into lines: a tweet spanning several
+    lines is then under-measured, but separate tweets are never summed.
+    """
+    markers = [marker for marker in _TWEET_NUMBER.finditer(thread) if 1 <= int(marker[1]) <= int(marker[2])]
+    if markers:
+        total, count = Counter(int(marker[2]) for marker in markers).most_common(1)[0]
+        markers = [marker for marker in markers if int(marker[2]) == total] if total >= count else []
+    if not markers:
+        markers = list(_TWEET_LABEL.finditer(thread))
+    if not markers:
+        return [line.strip() for line in thread.splitlines() if line.strip()]
+    bounds = [marker.start() for marker in markers] + [len(thread)]
+    return [thread[start:end].strip() for start, end in zip(bounds, bounds[1:])]
+
+
+def _twitter(content: str) -> List[str]:
+    return [
+        f"Tweet {number} is {len(tweet)} characters; each tweet must be under {TWEET_MAX_CHARS}."
+        for number, tweet in enumerate(split_tweets(content), 1)
+        if len(tweet) > TWEET_MAX_CHARS
+    ]
+
+
+def _linkedin(content: str) -> List[str]:
+    words = len(content.split())
+    low, high = LINKEDIN_WORDS
+    if low <= words <= high:
+        return []
+    return [f"The post is {words} words; it must be {low}-{high} words."]
+
+
+def _instagram(content: str) -> List[str]:
+    hashtags = len({tag.lower() for tag in _HASHTAG.findall(content)})
+    low, high = INSTAGRAM_HASHTAGS
+    if low <= hashtags <= high:
+        return []
+    return [f"The caption has {hashtags} distinct hashtags; it needs {low}-{high}."]
+
+
+def _newsletter(content: str) -> List[str]:
+    if _SUBJECT_LINE.search(content):
+        return []
+    return ["The newsletter has no subject line; start with a \"SUBJECT LINE:\" section."]
+
+
+RULES: Dict[str, Callable[[str], List[str]]] = {
+    "twitter": _twitter,
+    "linkedin": _linkedin,
+    "instagram": _instagram,
+    "newsletter": _newsletter,
+}
+
+
+def prescreen(platform: str, content: str) -> List[str]:
+    """
+    Mechanical rule violations in a draft for `platform` (label or key,
+    e.g. "LinkedIn"), as feedback sentences; empty when it passes or the
+    platform has no rules
+    """
+    rules = RULES.get(platform.lower())
+    return rules(content) if rules else []
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+
+from src.utils.env import getenv
+from src.utils.instrumentation import record_duration
+
+WINDOW_SECONDS = 60.0
+
+
+def default_rate_limits() -> Dict[str, Tuple[int, int]]:
+    """
+    (requests per minute, tokens per minute) per model. The Groq defaults
+    are its free-tier limits for llama-3.1-8b-instant; GROQ_RPM / GROQ_TPM
+    override them. Models without an entry (e.g. local Ollama) are unlimited.
+    """
+    return {
+        "llama-3.1-8b-instant": (int(getenv("GROQ_RPM", "30")), int(getenv("GROQ_TPM", "6000"))),
+    }
+
+
+def expected_completion_tokens() -> int:
+    """Tokens reserved for each response on top of the prompt (LLM_COMPLETION_TOKENS)"""
+    return int(getenv("LLM_COMPLETION_TOKENS", "400"))
+
+
+class RateWindow:
+    """
+    Sliding one-minute budget of requests and tokens for one model.
+
+    reserve() books the earliest start time at which the call fits both
+    budgets and returns how long the caller has to wait for it. Bookings
+    never start before earlier ones, so waiting callers are served in
+    arrival order, and thread and asyncio callers share one queue.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = max(1, rpm)
+        self.tpm = max(1, tpm)
+        # (start time, tokens) of booked calls, oldest first
+        self._bookings = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            now = time.monotonic()
+            start = self._earliest_start(tokens, now)
+            self._bookings.append((start, tokens))
+            return start - now
+
+    def wait(self, tokens: int) -> float:
+        """How long a call of `tokens` tokens would wait if booked now, without booking it"""
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            now = time.monotonic()
+            return self._earliest_start(tokens, now) - now
+
+    def _earliest_start(self, tokens: int, now: float) -> float:
+        while self._bookings and self._bookings[0][0] <= now - WINDOW_SECONDS:
+            self._bookings.popleft()
+
+        start = max(now, self._bookings[-1][0]) if self._bookings else now
+        in_window = [booking for booking in self._bookings if booking[0] > start - WINDOW_SECONDS]
+        used = sum(booked for _, booked in in_window)
+        # Push the start past the oldest bookings until this call fits
+        for booked_at, booked in in_window:
+            if len(in_window) < self.rpm and used + tokens <= self.tpm:
+                break
+            start = max(start, booked_at + WINDOW_SECONDS)
+            in_window = in_window[1:]
+            used -= booked
+        return start
+
+    def share_seconds(self, tokens: int) -> float:
+        """
+        Seconds of the window a call of `tokens` tokens uses up: its share of
+        the token or the request budget, whichever is larger
+        """
+        return WINDOW_SECONDS * max(min(tokens, self.tpm) / self.tpm, 1 / self.rpm)
+
+    def queued(self) -> int:
+        """Bookings that haven't started yet"""
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for start, _ in self._bookings if start > now)
+
+
+class RequestScheduler:
+    """
+    Process-wide scheduler that keeps every call to a rate-limited model
+    within its requests- and tokens-per-minute budgets. Calls that would
+    exceed them are queued (delayed) instead of being sent to fail with 429.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.limits = {**default_rate_limits(), **(limits or {})}
+        self._windows = {model: RateWindow(rpm, tpm) for model, (rpm, tpm) in self.limits.items()}
+
+    def _delay(self, model: str, tokens: int) -> float:
+        window = self._windows.get(model)
+        return window.reserve(tokens) if window is not None else 0.0
+
+    def is_limited(self, model: str) -> bool:
+        return model in self._windows
+
+    def queued(self, model: str) -> int:
+        window = self._windows.get(model)
+        return window.queued() if window is not None else 0
+
+    def wait(self, model: str, tokens: int) -> float:
+        """Seconds a call of about `tokens` tokens to `model` would be held back right now"""
+        window = self._windows.get(model)
+        return window.wait(tokens) if window is not None else 0.0
+
+    def share_seconds(self, model: str, tokens: int) -> float:
+        """Seconds of `model`'s per-minute budget a call of about `tokens` tokens takes up"""
+        window = self._windows.get(model)
+        return window.share_seconds(tokens) if window is not None else 0.0
+
+    @contextmanager
+    def slot(self, model: str, tokens: int):
+        """Wait until a call of about `tokens` tokens to `model` fits, then run the block"""
+        delay = self._delay(model, tokens)
+        if delay > 0:
+            record_duration("queue", model, delay)
+            time.sleep(delay)
+        yield
+
+    @asynccontextmanager
+    async def aslot(self, model: str, tokens: int):
+        """Async counterpart of slot(); waits without blocking the event loop"""
+        delay = self._delay(model, tokens)
+        if delay > 0:
+            record_duration("queue", model, delay)
+            await asyncio.sleep(delay)
+        yield
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def request_scheduler() -> RequestScheduler:
+    """The scheduler shared by every agent in the process"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
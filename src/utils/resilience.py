@@ -0,0 +1,222 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from src.utils.env import getenv
+from src.utils.instrumentation import record_retry
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+_RETRYABLE_STATUSES = {408, 409, 429}
+
+# HTTP statuses that mean the backend can't be used with these credentials
+_AUTH_STATUSES = {401, 403}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every backend a call may use has an open circuit breaker"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether an LLM call that raised `error` may succeed if simply tried again:
+    connection failures and timeouts, and 408/409/429/5xx responses from the
+    Groq SDK, httpx or Ollama. Anything else (bad requests, auth, parsing)
+    fails again the same way.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:  # pragma: no cover - httpx comes with both providers
+        pass
+    status = _status(error)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUSES or status >= 500
+    # The Groq SDK's connection and timeout errors carry no status
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Whether `error` says something about the backend rather than the call:
+    transient errors plus rejected credentials (401/403). Only these count
+    towards a circuit breaker; a bad request or an unparseable answer from
+    one caller says nothing about the backend's health for everyone else.
+    """
+    return is_transient(error) or _status(error) in _AUTH_STATUSES
+
+
+def _status(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+class CircuitBreaker:
+    """
+    Per-backend breaker. Closed, it lets every call through; after
+    `failure_threshold` consecutive failures it opens and refuses calls for
+    `reset_timeout` seconds, then lets a single trial call through
+    (half-open): success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.times_opened = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to this backend now; claims the trial call when half-open"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def available(self) -> bool:
+        """Like allow() but without claiming the half-open trial call"""
+        with self._lock:
+            state = self._state()
+            return state == "closed" or (state == "half_open" and not self._probing)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """Give back a claimed half-open trial without an outcome"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self._opened_at is None and self.failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+            self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self.failures, "times_opened": self.times_opened}
+
+
+class ResilienceMetrics:
+    """Process-wide counters of LLM retries and cross-backend fallbacks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+
+    def add_retry(self, name: str):
+        with self._lock:
+            self.retries[name] = self.retries.get(name, 0) + 1
+
+    def add_fallback(self, backend: str):
+        with self._lock:
+            self.fallbacks[backend] = self.fallbacks.get(backend, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"retries": dict(self.retries), "fallbacks": dict(self.fallbacks)}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_metrics = ResilienceMetrics()
+
+
+def circuit_breaker(backend: str) -> CircuitBreaker:
+    """
+    The process-wide breaker for `backend`. BREAKER_FAILURE_THRESHOLD
+    (default 5) and BREAKER_RESET_SECONDS (default 30) configure new ones.
+    """
+    with _breakers_lock:
+        if backend not in _breakers:
+            _breakers[backend] = CircuitBreaker(
+                int(getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+                float(getenv("BREAKER_RESET_SECONDS", "30"))
+            )
+        return _breakers[backend]
+
+
+def record_fallback(backend: str):
+    """Count a call sent to `backend` because its allowed backends' breakers were open"""
+    _metrics.add_fallback(backend)
+
+
+def _retry_options(name: str) -> dict:
+    """
+    Tenacity settings for LLM calls made by `name`: up to LLM_MAX_ATTEMPTS
+    (default 3) attempts on transient errors, with full-jitter exponential
+    backoff starting at LLM_RETRY_BASE_SECONDS (default 1) and capped at
+    LLM_RETRY_MAX_SECONDS (default 20). Every retry is counted both for
+    the running node's timings and process-wide.
+    """
+    def before_sleep(retry_state):
+        record_retry(f"llm:{name}")
+        _metrics.add_retry(name)
+
+    return {
+        "stop": stop_after_attempt(max(1, int(getenv("LLM_MAX_ATTEMPTS", "3")))),
+        "wait": wait_random_exponential(
+            multiplier=float(getenv("LLM_RETRY_BASE_SECONDS", "1")),
+            max=float(getenv("LLM_RETRY_MAX_SECONDS", "20"))
+        ),
+        "retry": retry_if_exception(is_transient),
+        "before_sleep": before_sleep,
+        "reraise": True,
+    }
+
+
+def retrying(name: str) -> Retrying:
+    """`for attempt in retrying(name): with attempt: ...`"""
+    return Retrying(**_retry_options(name))
+
+
+def aretrying(name: str) -> AsyncRetrying:
+    """`async for attempt in aretrying(name): with attempt: ...`"""
+    return AsyncRetrying(**_retry_options(name))
+
+
+def resilience_stats() -> dict:
+    """Breaker state per backend, and retry and fallback counts, for this process"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {
+        "breakers": {backend: breaker.stats() for backend, breaker in sorted(breakers.items())},
+        **_metrics.stats(),
+    }
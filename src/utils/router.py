@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence
+
+from src.utils.concurrency import default_provider_limits
+from src.utils.env import getenv
+
+# Latency assumed for a backend before any call to it has finished
+LATENCY_PRIORS = {"groq": 2.0, "ollama": 6.0}
+
+# Calls remembered per backend for the rolling latency and error rate
+_HISTORY = 20
+
+
+def routing_enabled() -> bool:
+    """LLM_ROUTING=0 pins every agent to its home backend"""
+    return getenv("LLM_ROUTING", "1") not in ("0", "false", "off", "")
+
+
+def switch_margin() -> float:
+    """
+    Another backend must be expected to finish in under this fraction of the
+    home backend's time before a call is moved (ROUTER_SWITCH_MARGIN)
+    """
+    return float(getenv("ROUTER_SWITCH_MARGIN", "0.8"))
+
+
+class BackendStats:
+    def __init__(self):
+        self.latencies = deque(maxlen=_HISTORY)
+        self.outcomes = deque(maxlen=_HISTORY)
+        self.in_flight = 0
+        self.routed = 0
+
+
+class BackendRouter:
+    """
+    Picks the backend for each LLM call from the caller's allowed list by
+    expected completion time: the wait its rate limit would impose, plus
+    its rolling mean latency stretched by the calls already waiting for or
+    holding its concurrency slots beyond its limit, and by its recent error
+    rate. Calls still held back by the rate limit aren't counted there;
+    the wait already covers them.
+    """
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None):
+        self.concurrency = {**default_provider_limits(), **(concurrency or {})}
+        self._stats: Dict[str, BackendStats] = {}
+        self._lock = threading.Lock()
+
+    def _backend(self, backend: str) -> BackendStats:
+        if backend not in self._stats:
+            self._stats[backend] = BackendStats()
+        return self._stats[backend]
+
+    def expected_seconds(self, backend: str, wait: float = 0.0) -> float:
+        with self._lock:
+            return self._expected(backend, wait)
+
+    def _expected(self, backend: str, wait: float) -> float:
+        stats = self._backend(backend)
+        latency = (sum(stats.latencies) / len(stats.latencies)) if stats.latencies \
+            else LATENCY_PRIORS.get(backend, 5.0)
+        slots = max(1, self.concurrency.get(backend, 1))
+        # A free slot starts the call now; otherwise wait for the queue ahead to drain
+        expected = latency * (1 + max(0, stats.in_flight - slots + 1) / slots)
+        error_rate = stats.outcomes.count(False) / len(stats.outcomes) if stats.outcomes else 0.0
+        return wait + expected / (1 - min(error_rate, 0.95))
+
+    def choose(self, allowed: Sequence[str], waits: Optional[Dict[str, float]] = None) -> str:
+        """
+        Best backend in `allowed`; the first entry is the caller's home
+        backend and wins unless another is clearly faster. `waits` gives
+        the seconds each backend's rate limit would cost this call.
+        """
+        home = allowed[0]
+        if len(allowed) == 1 or not routing_enabled():
+            chosen = home
+        else:
+            waits = waits or {}
+            with self._lock:
+                expected = {
+                    backend: self._expected(backend, waits.get(backend, 0.0))
+                    for backend in allowed
+                }
+            best = min(allowed, key=lambda backend: expected[backend])
+            chosen = best if expected[best] < expected[home] * switch_margin() else home
+        with self._lock:
+            self._backend(chosen).routed += 1
+        return chosen
+
+    @contextmanager
+    def pending(self, backend: str):
+        """
+        Count the enclosed call (waiting for a concurrency slot or running)
+        towards `backend`'s depth
+        """
+        with self._lock:
+            self._backend(backend).in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._backend(backend).in_flight -= 1
+
+    @contextmanager
+    def observe(self, backend: str):
+        """Record the latency and outcome of the LLM call in the block"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self._backend(backend).outcomes.append(False)
+            raise
+        with self._lock:
+            stats = self._backend(backend)
+            stats.latencies.append(time.perf_counter() - started)
+            stats.outcomes.append(True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                backend: {
+                    "routed": stats.routed,
+                    "in_flight": stats.in_flight,
+                    "mean_latency": round(sum(stats.latencies) / len(stats.latencies), 3) if stats.latencies else None,
+                    "error_rate": round(stats.outcomes.count(False) / len(stats.outcomes), 3) if stats.outcomes else 0.0,
+                }
+                for backend, stats in sorted(self._stats.items())
+            }
+
+
+_router: Optional[BackendRouter] = None
+_router_lock = threading.Lock()
+
+
+def backend_router() -> BackendRouter:
+    """The router shared by every agent in the process"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = BackendRouter()
+        return _router
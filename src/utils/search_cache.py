@@ -0,0 +1,118 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.cache import PersistentCache, fast_hash
+from src.utils.env import getenv
+
+# Usage counter of the research run in progress; see counting_search_cache()
+_current_usage = contextvars.ContextVar("search_cache_usage", default=None)
+
+
+def default_search_cache_path() -> Optional[str]:
+    """
+    SQLite file for cached search results. Set SEARCH_CACHE_PATH to change
+    it, or to an empty string to turn the search cache off.
+    """
+    return getenv("SEARCH_CACHE_PATH", "search_cache.sqlite") or None
+
+
+def normalise_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query"""
+    return " ".join(query.lower().split())
+
+
+class SearchCacheUsage:
+    """Thread-safe fresh/stale/miss counts for one research run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "stale_hits": 0, "misses": 0}
+
+    def add(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            lookups = sum(self.counts.values())
+            served = self.counts["hits"] + self.counts["stale_hits"]
+            return {**self.counts, "hit_rate": round(served / lookups, 3) if lookups else 0.0}
+
+
+class SearchCache:
+    """
+    Search results by (provider, normalised query, max_results) in a
+    PersistentCache. Entries younger than `fresh_for` seconds are served as
+    is; for `stale_for` seconds after that they are still served, but
+    flagged stale so the caller can refresh them in the background
+    (stale-while-revalidate); older entries are gone.
+    """
+
+    def __init__(self, store: PersistentCache, fresh_for: float, stale_for: float):
+        self.store = store
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+
+    @staticmethod
+    def _key(provider: str, query: str, max_results: int) -> str:
+        return fast_hash(provider, normalise_query(query), str(max_results))
+
+    def get(self, provider: str, query: str, max_results: int) -> Optional[Tuple[List[Dict], bool]]:
+        """(results, fresh) or None"""
+        entry = self.store.get(self._key(provider, query, max_results))
+        if entry is None:
+            return None
+        return entry["results"], time.time() - entry["fetched"] <= self.fresh_for
+
+    def set(self, provider: str, query: str, max_results: int, results: List[Dict]):
+        self.store.set(self._key(provider, query, max_results), {"results": results, "fetched": time.time()})
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+@lru_cache(maxsize=None)
+def search_cache() -> Optional[SearchCache]:
+    """
+    The process-wide search cache, or None when SEARCH_CACHE_PATH is empty.
+    SEARCH_CACHE_TTL (seconds results stay fresh, default a day),
+    SEARCH_CACHE_STALE_SECONDS (how much longer they may be served while
+    being refreshed, default six days) and SEARCH_CACHE_MAX_ENTRIES
+    (default 5000) configure it.
+    """
+    path = default_search_cache_path()
+    if not path:
+        return None
+    fresh_for = float(getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+    stale_for = float(getenv("SEARCH_CACHE_STALE_SECONDS", str(6 * 24 * 3600)))
+    max_entries = int(getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+    store = PersistentCache(path, namespace="search", ttl=fresh_for + stale_for, max_entries=max_entries or None)
+    return SearchCache(store, fresh_for, stale_for)
+
+
+def record_search_cache(outcome: str):
+    """Count a "hits", "stale_hits" or "misses" outcome for the run in progress, if any"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(outcome)
+
+
+@contextmanager
+def counting_search_cache():
+    """Count search cache outcomes of the enclosed block (and work it fans out)"""
+    usage = SearchCacheUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def search_cache_stats() -> dict:
+    """Hit/miss counts of the search cache in this process"""
+    cache = search_cache()
+    return cache.stats() if cache is not None else {}
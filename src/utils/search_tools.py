@@ -1,27 +1,102 @@
-from tavily import TavilyClient
-from duckduckgo_search import DDGS
-import os
-from dotenv import load_dotenv
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict
+from src.utils.env import getenv
+from src.utils.instrumentation import track
+from src.utils.search_cache import normalise_query, record_search_cache, search_cache
+from src.utils.single_flight import single_flight
+
+# Shared search clients: one pooled Tavily session for the process, and one
+# DDGS per search thread (DDGS isn't safe to share between threads)
+_tavily_client = None
+_tavily_error = None
+_tavily_lock = threading.Lock()
+_ddgs_local = threading.local()
+
+# Cache keys being refreshed in the background
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def search_max_concurrency() -> int:
+    """Searches run at once across the process (SEARCH_MAX_CONCURRENCY, default 6)"""
+    return max(1, int(getenv("SEARCH_MAX_CONCURRENCY", "6")))
+
+
+@lru_cache(maxsize=None)
+def search_executor() -> ThreadPoolExecutor:
+    """
+    Long-lived, bounded pool every fan-out search runs on, so its threads
+    (and their DDGS clients) are reused from one research run to the next
+    """
+    return ThreadPoolExecutor(max_workers=search_max_concurrency(), thread_name_prefix="search")
+
+
+def shared_tavily_client():
+    """
+    The process-wide TavilyClient. Its requests session keeps up to
+    search_max_concurrency() connections alive for concurrent searches. Imported on first search so loading this module stays cheap.
+    If the client can't be built (e.g. no TAVILY_API_KEY), that is reported
+    once and the same error raised on every call.
+    """
+    global _tavily_client, _tavily_error
+    with _tavily_lock:
+        if _tavily_client is None and _tavily_error is None:
+            try:
+                import requests
+                from tavily import TavilyClient
+                client = TavilyClient(api_key=getenv("TAVILY_API_KEY"))
+                # Every request goes through client.session (tavily-python
+                # 0.8.5+, see requirements.txt); size its pool for the fan-out
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=search_max_concurrency())
+                client.session.mount("https://", adapter)
+                client.session.mount("http://", adapter)
+                _tavily_client = client
+            except Exception as e:
+                _tavily_error = e
+                print(f"⚠️  Tavily unavailable, searching with DuckDuckGo only: {type(e).__name__}: {e}")
+        if _tavily_error is not None:
+            raise _tavily_error
+        return _tavily_client
+
+
+def thread_ddgs_client():
+    """This thread's DDGS client, created on first use and reused after"""
+    if getattr(_ddgs_local, "client", None) is None:
+        from duckduckgo_search import DDGS
+        _ddgs_local.client = DDGS()
+    return _ddgs_local.client
 
-load_dotenv()
 
 class SearchTools:
     """Unified search interface using multiple sources"""
     
-    def __init__(self):
-        self.tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    @property
+    def tavily_client(self):
+        return shared_tavily_client()
     
     def tavily_search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Search using Tavily (LLM-optimized, returns clean content)
         """
+        return self._cached_search("tavily", query, max_results, self._fetch_tavily)
+
+    def _fetch_tavily(self, query: str, max_results: int) -> List[Dict]:
         try:
-            response = self.tavily_client.search(
-                query=query,
-                max_results=max_results,
-                search_depth="advanced"  # More comprehensive results
-            )
+            client = self.tavily_client
+        except Exception:
+            # Already reported by shared_tavily_client()
+            return []
+        try:
+            with track("search", "tavily"):
+                response = client.search(
+                    query=query,
+                    max_results=max_results,
+                    search_depth="advanced"  # More comprehensive results
+                )
             
             results = []
             for item in response.get('results', []):
@@ -34,23 +109,29 @@ class SearchTools:
             
             return results
         except Exception as e:
-            print(f"Tavily search error: {e}")
+            print(f"Tavily search error for {query!r}: {type(e).__name__}: {e}")
             return []
     
     def duckduckgo_search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Backup search using DuckDuckGo (free, unlimited)
         """
+        return self._cached_search("duckduckgo", query, max_results, self._fetch_duckduckgo)
+
+    def _fetch_duckduckgo(self, query: str, max_results: int) -> List[Dict]:
         try:
-            ddgs = DDGS()
+            ddgs = thread_ddgs_client()
             results = []
             
-            for result in ddgs.text(query, max_results=max_results):
+            with track("search", "duckduckgo"):
+                hits = ddgs.text(query, max_results=max_results)
+            
+            for result in hits:
                 results.append({
                     'title': result.get('title', ''),
                     'url': result.get('href', ''),
                     'content': result.get('body', ''),
-                    'score': 1.0  # DDG doesn't provide scores
+                    'score': None  # DDG doesn't provide scores
                 })
             
             return results
@@ -58,16 +139,87 @@ class SearchTools:
             print(f"DuckDuckGo search error: {e}")
             return []
     
+    def _cached_search(self, provider: str, query: str, max_results: int, fetch) -> List[Dict]:
+        """
+        Results from the search cache (see src.utils.search_cache) when it
+        has them, else from fetch(). Stale entries are returned straight
+        away and refreshed on the search pool. Empty results, which is
+        how the providers report errors, are never cached.
+        """
+        cache = search_cache()
+        if cache is None:
+            return fetch(query, max_results)
+        entry = cache.get(provider, query, max_results)
+        if entry is not None:
+            results, fresh = entry
+            record_search_cache("hits" if fresh else "stale_hits")
+            if not fresh:
+                self._revalidate(cache, provider, query, max_results, fetch)
+            return results
+        record_search_cache("misses")
+        results = fetch(query, max_results)
+        if results:
+            cache.set(provider, query, max_results, results)
+        return results
+
+    def _revalidate(self, cache, provider: str, query: str, max_results: int, fetch):
+        key = (provider, normalise_query(query), max_results)
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def refresh():
+            try:
+                results = fetch(query, max_results)
+                if results:
+                    cache.set(provider, query, max_results, results)
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        # A fresh context: the refresh isn't part of the node that found the stale entry
+        search_executor().submit(contextvars.Context().run, refresh)
+
     def smart_search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
-        Intelligently uses Tavily first, falls back to DuckDuckGo
+        Intelligently uses Tavily first, falls back to DuckDuckGo.
+        Identical searches already in flight (e.g. from concurrent campaigns
+        on the same topic) are shared rather than repeated.
         """
+        key = (normalise_query(query), max_results)
+        results = single_flight("search").do(key, lambda: self._search(query, max_results))
+        # Each caller gets its own list
+        return list(results)
+
+    def _search(self, query: str, max_results: int) -> List[Dict]:
         # Try Tavily first (better for LLM consumption)
         results = self.tavily_search(query, max_results)
         
         # Fallback to DuckDuckGo if Tavily fails or returns nothing
         if not results:
-            print("Tavily failed, using DuckDuckGo backup...")
+            print(f"Tavily returned nothing for {query!r}, using DuckDuckGo backup...")
             results = self.duckduckgo_search(query, max_results)
         
         return results
+
+    def search_many(self, queries: List[str], max_results: int = 5) -> List[List[Dict]]:
+        """
+        smart_search() for every query at once on the shared search pool.
+        Results come back in query order, whatever order they finish in.
+        """
+        futures = [
+            search_executor().submit(contextvars.copy_context().run, self.smart_search, query, max_results)
+            for query in queries
+        ]
+        return [future.result() for future in futures]
+
+    async def asearch_many(self, queries: List[str], max_results: int = 5) -> List[List[Dict]]:
+        """Async counterpart of search_many(); waits without blocking the event loop"""
+        futures = [
+            asyncio.wrap_future(
+                search_executor().submit(contextvars.copy_context().run, self.smart_search, query, max_results)
+            )
+            for query in queries
+        ]
+        return list(await asyncio.gather(*futures))
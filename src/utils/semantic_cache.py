@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from src.utils.cache import content_hash, fast_hash
+from src.utils.env import getenv
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def hashed_embedding(text: str, dim: int = 512) -> np.ndarray:
+    """
+    Local embedding with no model to download: word unigrams, word bigrams
+    and character 4-grams feature-hashed into `dim` signed buckets and
+    L2-normalised. Rephrasings that share most words and stems ("trend" /
+    "trends", reordered clauses) land close together under cosine
+    similarity; unrelated briefs don't.
+    """
+    words = _WORD.findall(text.lower())
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [padded[i:i + 4] for i in range(max(1, len(padded) - 3))]
+
+    vector = np.zeros(dim, dtype="float32")
+    for feature in features:
+        digest = int(fast_hash(feature)[:16], 16)
+        vector[digest % dim] += 1.0 if (digest >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def ollama_embedding(model: str) -> Callable[[str], np.ndarray]:
+    """Embedding function backed by a local Ollama embedding model"""
+    from langchain_ollama import OllamaEmbeddings
+    embeddings = OllamaEmbeddings(model=model)
+
+    def embed(text: str) -> np.ndarray:
+        vector = np.asarray(embeddings.embed_query(text), dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    return embed
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache: a lookup returns the value stored for the most
+    similar earlier request in the same `scope` if its cosine similarity
+    reaches `threshold`.
+
+    Request texts are embedded with `embed` (unit vectors) into a FAISS
+    inner-product index. Values, the texts they were stored under and an
+    optional exact-match `scope` live in SQLite next to the index; the index
+    is extended one vector at a time and written back after every store.
+    If the index file is missing or behind the table it is rebuilt from the
+    stored texts. Entries older than `ttl` seconds are never matched and
+    are dropped from both at the next store.
+
+    Lookups and stores block (embedding, FAISS search, writing the index),
+    so coroutines run them with asyncio.to_thread.
+    """
+
+    def __init__(self, directory: str, namespace: str, threshold: float = 0.9,
+                 embed: Callable[[str], np.ndarray] = hashed_embedding, embedder_name: str = "hashed",
+                 ttl: Optional[float] = None):
+        import faiss
+
+        self._faiss = faiss
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embed = embed
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # Vectors from different embedders aren't comparable, so each gets its own index
+        self.index_path = os.path.join(directory, f"{namespace}-{embedder_name}.faiss")
+        self._conn = sqlite3.connect(os.path.join(directory, f"{namespace}.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, text TEXT NOT NULL, scope TEXT NOT NULL, "
+            "value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_scope ON entries (scope)")
+        self._conn.commit()
+        self._index = self._load_index()
+
+    def _new_index(self, dim: int):
+        return self._faiss.IndexIDMap2(self._faiss.IndexFlatIP(dim))
+
+    def _load_index(self):
+        rows = self._conn.execute("SELECT id, text FROM entries ORDER BY id").fetchall()
+        if os.path.exists(self.index_path):
+            index = self._faiss.read_index(self.index_path)
+            if index.ntotal == len(rows):
+                return index
+        if not rows:
+            return None
+        print(f"Rebuilding semantic cache index for {self.namespace} ({len(rows)} entries)")
+        vectors = np.stack([self.embed(text) for _, text in rows])
+        index = self._new_index(vectors.shape[1])
+        index.add_with_ids(vectors, np.array([row_id for row_id, _ in rows], dtype="int64"))
+        self._write_index(index)
+        return index
+
+    def _write_index(self, index):
+        # Write then rename so a crash never leaves a truncated index behind
+        partial = self.index_path + ".tmp"
+        self._faiss.write_index(index, partial)
+        os.replace(partial, self.index_path)
+
+    def lookup(self, text: str, scope: str = "") -> Optional[dict]:
+        """
+        {"value": ..., "similarity": ..., "text": <stored request>} for the
+        closest entry in `scope` at or above the threshold, else None
+        """
+        vector = self.embed(text)[None, :]
+        with self._lock:
+            in_scope = [row[0] for row in self._conn.execute(
+                "SELECT id FROM entries WHERE scope = ? AND created >= ?", (scope, self._oldest())
+            )]
+            if self._index is not None and in_scope:
+                # Search only this scope's vectors, however many other scopes share the text
+                selector = self._faiss.IDSelectorBatch(np.array(in_scope, dtype="int64"))
+                scores, ids = self._index.search(vector, 1, params=self._faiss.SearchParameters(sel=selector))
+                score, row_id = float(scores[0][0]), int(ids[0][0])
+                if row_id >= 0 and score >= self.threshold:
+                    row = self._conn.execute("SELECT text, value FROM entries WHERE id = ?", (row_id,)).fetchone()
+                    self.hits += 1
+                    return {"value": json.loads(row[1]), "similarity": round(score, 4), "text": row[0]}
+            self.misses += 1
+            return None
+
+    def store(self, text: str, value: Any, scope: str = ""):
+        vector = self.embed(text)[None, :]
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (text, scope, value, created) VALUES (?, ?, ?, ?)",
+                (text, scope, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+            if self._index is None:
+                self._index = self._new_index(vector.shape[1])
+            self._index.add_with_ids(vector, np.array([cursor.lastrowid], dtype="int64"))
+            self._drop_expired()
+            self._write_index(self._index)
+
+    def _oldest(self) -> float:
+        """Creation time of the oldest entry still fresh enough to match"""
+        return time.time() - self.ttl if self.ttl is not None else 0.0
+
+    def _drop_expired(self):
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT id FROM entries WHERE created < ?", (self._oldest(),)
+        )]
+        if not expired:
+            return
+        self._conn.executemany("DELETE FROM entries WHERE id = ?", [(row_id,) for row_id in expired])
+        self._conn.commit()
+        self._index.remove_ids(np.array(expired, dtype="int64"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": self._index.ntotal if self._index is not None else 0,
+            }
+
+
+def request_scope(**fields: str) -> str:
+    """
+    Exact-match scope for the fields a cached request must share with the
+    new one (e.g. brand and audience), ignoring case and spacing. Keeping
+    such long, fixed texts out of the embedding lets the short part that
+    varies (the topic) decide similarity.
+    """
+    return content_hash({name: " ".join(value.lower().split()) for name, value in fields.items()})
+
+
+def semantic_cache(namespace: str) -> Optional[SemanticCache]:
+    """
+    Process-wide semantic cache for `namespace`, or None when disabled.
+    Turned on by SEMANTIC_CACHE_DIR; SEMANTIC_CACHE_THRESHOLD sets the
+    minimum cosine similarity (default 0.9) and SEMANTIC_CACHE_TTL how many
+    seconds entries are reused for (default a week). SEMANTIC_CACHE_EMBEDDINGS=
+    ollama:<model> embeds with a local Ollama model instead of hashing.
+    """
+    directory = getenv("SEMANTIC_CACHE_DIR", "")
+    if not directory:
+        return None
+    with _caches_lock:
+        if namespace not in _caches:
+            threshold = float(getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+            ttl = float(getenv("SEMANTIC_CACHE_TTL", str(7 * 24 * 3600))) or None
+            embedder = getenv("SEMANTIC_CACHE_EMBEDDINGS", "hashed")
+            if embedder.startswith("ollama:"):
+                model = embedder.split(":", 1)[1]
+                _caches[namespace] = SemanticCache(
+                    directory, namespace, threshold, ollama_embedding(model),
+                    embedder_name=f"ollama-{re.sub(r'[^A-Za-z0-9_.-]', '_', model)}", ttl=ttl
+                )
+            else:
+                _caches[namespace] = SemanticCache(directory, namespace, threshold, ttl=ttl)
+        return _caches[namespace]
+
+
+def semantic_cache_stats() -> dict:
+    """Hit/miss counts per namespace for the caches opened in this process"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+_groups_lock = threading.Lock()
+
+
+class _LeaderGone(Exception):
+    """Set on a shared call whose leader was cancelled or interrupted"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for `key` is in
+    flight, further calls with the same key wait for it and get its result
+    (or its exception) instead of starting their own. Nothing is kept once
+    the call finishes; this only stops the thundering herd that arrives
+    before any cache entry exists. If the leader is cancelled (or otherwise
+    interrupted), its waiters don't inherit that: they join again, and the
+    first of them leads a fresh call.
+
+    do() serves threads and ado() serves coroutines, and both share one
+    table, so a coroutine can wait on a call a thread started and vice
+    versa. do() must not be called on a thread running an event loop whose
+    coroutine leads the same key; it would block that loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """The future for `key` and whether the caller leads (makes) the call"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            # Running futures can't be cancelled by waiters, only completed by the leader
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _fail(self, key: Hashable, future: Future, error: BaseException):
+        if isinstance(error, Exception):
+            future.set_exception(error)
+            return
+        # Cancellation belongs to the leader alone: drop the entry before
+        # waking the waiters so they elect a new leader instead of failing
+        self._finish(key, future)
+        future.set_exception(_LeaderGone())
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """fn(), unless an identical call is in flight, in which case its result"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except _LeaderGone:
+                continue
+        try:
+            result = fn()
+        except BaseException as error:
+            self._fail(key, future, error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of do(); `fn` returns the awaitable to run"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded so a cancelled waiter doesn't cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderGone:
+                continue
+        try:
+            result = await fn()
+        except BaseException as error:
+            self._fail(key, future, error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.calls + self.shared
+            return {
+                "calls": self.calls,
+                "shared": self.shared,
+                "share_rate": round(self.shared / requests, 3) if requests else 0.0,
+            }
+
+
+def single_flight(name: str) -> SingleFlight:
+    """The process-wide coalescing group `name` (e.g. "llm", "search")"""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def single_flight_stats() -> dict:
+    """Calls made and calls shared per group in this process"""
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: group.stats() for name, group in sorted(groups.items())}
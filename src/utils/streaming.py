@@ -0,0 +1,82 @@
+import contextvars
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, ClassVar
+
+# Where events for the current run go. Set by the orchestrator's stream /
+# astream for the duration of a run; context variables carry it into graph
+# nodes, worker threads and agent calls.
+_current_sink = contextvars.ContextVar("event_sink", default=None)
+_current_node = contextvars.ContextVar("current_node", default="")
+
+
+@dataclass
+class StreamEvent:
+    type: ClassVar[str] = ""
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass
+class NodeStarted(StreamEvent):
+    type: ClassVar[str] = "node_started"
+    node: str
+
+
+@dataclass
+class NodeFinished(StreamEvent):
+    type: ClassVar[str] = "node_finished"
+    node: str
+    seconds: float
+
+
+@dataclass
+class TokenChunk(StreamEvent):
+    """A piece of a platform draft as the LLM produces it"""
+    type: ClassVar[str] = "token"
+    platform: str
+    node: str
+    text: str
+
+
+@dataclass
+class RunCompleted(StreamEvent):
+    """Last event of a stream; `state` is what run() would have returned"""
+    type: ClassVar[str] = "completed"
+    state: dict = field(default_factory=dict)
+
+
+def streaming_active() -> bool:
+    return _current_sink.get() is not None
+
+
+def emit(event: StreamEvent):
+    """Send an event to the active stream, if any"""
+    sink = _current_sink.get()
+    if sink is not None:
+        sink(event)
+
+
+def current_node() -> str:
+    return _current_node.get()
+
+
+@contextmanager
+def event_sink(callback: Callable[[StreamEvent], None]):
+    """Deliver every event emitted inside the block to `callback`"""
+    token = _current_sink.set(callback)
+    try:
+        yield
+    finally:
+        _current_sink.reset(token)
+
+
+@contextmanager
+def node_scope(node: str):
+    """Mark the enclosed block as running on behalf of graph node `node`"""
+    token = _current_node.set(node)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
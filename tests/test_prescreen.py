@@ -0,0 +1,58 @@
+from src.utils.prescreen import TWEET_MAX_CHARS, prescreen, split_tweets
+
+
+def test_split_tweets_on_markers_drops_preamble():
+    thread = "Here's the thread:\n\n1/3 First tweet\n\n2/3 Second\ntweet\n\n3/3 Third tweet"
+    assert split_tweets(thread) == ["1/3 First tweet", "2/3 Second\ntweet", "3/3 Third tweet"]
+
+
+def test_split_tweets_ignores_fractions_that_are_not_markers():
+    thread = "1/3 First\n24/7 support\n2/3 Second\n3/4 of teams agree\n3/3 Third"
+    assert split_tweets(thread) == [
+        "1/3 First\n24/7 support",
+        "2/3 Second\n3/4 of teams agree",
+        "3/3 Third",
+    ]
+
+
+def test_split_tweets_on_labels():
+    thread = "Tweet 1: First tweet\nTweet 2: Second tweet\nTweet 3: Third tweet"
+    assert split_tweets(thread) == ["Tweet 1: First tweet", "Tweet 2: Second tweet", "Tweet 3: Third tweet"]
+
+
+def test_split_tweets_unnumbered_splits_lines():
+    thread = "First tweet\nSecond tweet\n\nThird tweet"
+    assert split_tweets(thread) == ["First tweet", "Second tweet", "Third tweet"]
+
+
+def test_twitter_unnumbered_thread_without_blank_lines_passes():
+    thread = "\n".join(["x" * 200] * 4)
+    assert prescreen("twitter", thread) == []
+
+
+def test_twitter_flags_long_tweet():
+    thread = f"1/2 {'x' * TWEET_MAX_CHARS}\n\n2/2 Short"
+    violations = prescreen("Twitter", thread)
+    assert len(violations) == 1
+    assert violations[0].startswith("Tweet 1 is")
+
+
+def test_linkedin_word_count():
+    assert prescreen("linkedin", " ".join(["word"] * 250)) == []
+    assert prescreen("linkedin", " ".join(["word"] * 50)) == ["The post is 50 words; it must be 200-300 words."]
+
+
+def test_instagram_counts_distinct_hashtags():
+    tags = " ".join(f"#tag{i}" for i in range(12))
+    assert prescreen("instagram", f"Caption {tags}") == []
+    assert prescreen("instagram", "Caption #a #A #b") == ["The caption has 2 distinct hashtags; it needs 10-15."]
+
+
+def test_newsletter_subject_line():
+    assert prescreen("newsletter", "## Subject: Big news\n\nBody") == []
+    assert prescreen("newsletter", "SUBJECT LINE: Big news\n\nBody") == []
+    assert len(prescreen("newsletter", "Hello readers,\n\nBody")) == 1
+
+
+def test_platform_without_rules():
+    assert prescreen("blog", "anything") == []